@@ -0,0 +1,76 @@
+"""
+Micro-benchmark for the RSS cog's html cleanup, against the previous implementation.
+
+Run from the repository root:
+
+    python benchmarks/html_bench.py
+"""
+import html.parser
+import pathlib
+import re
+import sys
+import timeit
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from rss.cleanup import html_to_text  # noqa: E402
+
+# ---- the implementation this replaced, kept here for comparison
+
+WhitespaceHandler = re.compile("<p>|<br>|<li>", flags=re.MULTILINE)
+
+
+class LegacyExtractor(html.parser.HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.result = []
+
+    def handle_data(self, d):
+        self.result.append(d)
+
+    def get_text(self):
+        return "".join(self.result)
+
+
+def legacy_html_to_text(html_data):
+    html_data = WhitespaceHandler.sub("\n", html_data)
+    s = LegacyExtractor()
+    s.feed(html_data)
+    return s.get_text()
+
+
+# ---- samples
+
+SAMPLES = {
+    "plain title": "An ordinary entry title without any markup at all",
+    "short html": "<p>Some <b>bold</b> text &amp; a <a href='#'>link</a></p>",
+    "entities only": "Fish &amp; Chips &mdash; now with &quot;more&quot; vinegar",
+    "long html (50KB)": "<p>" + "lorem <em>ipsum</em> dolor sit amet. " * 1500 + "</p>",
+}
+
+
+def main():
+    print("{:<20} {:>12} {:>12} {:>8}".format("sample", "legacy", "current", "speedup"))
+    for name, sample in SAMPLES.items():
+        expected = legacy_html_to_text(sample)
+        assert html_to_text(sample) == expected, name
+        assert html_to_text(sample, limit=2000) == expected[:2000], name
+
+        number = 200 if len(sample) > 10000 else 20000
+        legacy = min(
+            timeit.repeat(lambda: legacy_html_to_text(sample), number=number, repeat=3)
+        )
+        current = min(
+            timeit.repeat(
+                lambda: html_to_text(sample, limit=2000), number=number, repeat=3
+            )
+        )
+        print(
+            "{:<20} {:>10.2f}us {:>10.2f}us {:>7.1f}x".format(
+                name, legacy / number * 1e6, current / number * 1e6, legacy / current
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+"""
+Offline benchmark for the RSS cog's polling path.
+
+This starts a local aiohttp server serving synthetic RSS and Atom feeds,
+then drives the cog against a stand-in bot, channels, and config,
+so no discord connection (or Red instance) is needed.
+
+Run from the repository root, in an environment with the cog's requirements:
+
+    python benchmarks/rss_bench.py --feeds 1000 --latency 200 --failure-rate 0.05
+
+Reported per cycle: wall time, fetch latency percentiles, posts made,
+event loop lag, and (with --trace-memory) peak traced memory.
+"""
+import argparse
+import asyncio
+import copy
+import pathlib
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from email.utils import formatdate
+from typing import Dict, List
+
+from aiohttp import web
+import discord
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import rss.core  # noqa: E402
+
+
+# ---- synthetic feeds
+
+
+def make_rss(slug: str, start: int, count: int, size: int) -> str:
+    body = "<p>" + "lorem ipsum &amp; dolor " * (size // 22 + 1) + "</p>"
+    items = "".join(
+        "<item><title>{slug} entry {i}</title><link>http://bench/{slug}/{i}</link>"
+        "<guid>{slug}-{i}</guid><pubDate>{date}</pubDate>"
+        "<description><![CDATA[{body}]]></description></item>".format(
+            slug=slug, i=i, date=formatdate(1500000000 + i * 3600), body=body
+        )
+        for i in range(start + count - 1, start - 1, -1)
+    )
+    return (
+        '<?xml version="1.0"?><rss version="2.0"><channel>'
+        "<title>{slug}</title><link>http://bench/{slug}</link>"
+        "<description>benchmark feed</description>{items}</channel></rss>"
+    ).format(slug=slug, items=items)
+
+
+def make_atom(slug: str, start: int, count: int, size: int) -> str:
+    body = "<p>" + "lorem ipsum &amp; dolor " * (size // 22 + 1) + "</p>"
+    entries = "".join(
+        "<entry><title>{slug} entry {i}</title><link href='http://bench/{slug}/{i}'/>"
+        "<id>urn:bench:{slug}:{i}</id><updated>{date}</updated>"
+        "<content type='html'><![CDATA[{body}]]></content></entry>".format(
+            slug=slug,
+            i=i,
+            date=time.strftime(
+                "%Y-%m-%dT%H:%M:%SZ", time.gmtime(1500000000 + i * 3600)
+            ),
+            body=body,
+        )
+        for i in range(start + count - 1, start - 1, -1)
+    )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom">'
+        "<title>{slug}</title><id>urn:bench:{slug}</id>"
+        "<updated>2017-07-14T02:40:00Z</updated>{entries}</feed>"
+    ).format(slug=slug, entries=entries)
+
+
+class FeedServer:
+    def __init__(self, args):
+        self.args = args
+        self.cycle = 0
+        self.random = random.Random(args.seed)
+
+    def body_for(self, slug: str) -> str:
+        start = self.cycle * self.args.new_per_cycle
+        index = int(slug[1:])
+        maker = make_atom if index % 100 < self.args.atom_percent else make_rss
+        return maker(slug, start, self.args.entries, self.args.entry_size)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        slug = request.match_info["slug"]
+        await asyncio.sleep(
+            max(self.random.gauss(self.args.latency, self.args.latency / 4), 0) / 1000
+        )
+        if self.random.random() < self.args.failure_rate:
+            return web.Response(status=503)
+        etag = '"{}-{}"'.format(slug, self.cycle)
+        if request.headers.get("If-None-Match", None) == etag:
+            return web.Response(status=304)
+        return web.Response(
+            text=self.body_for(slug),
+            content_type="application/rss+xml",
+            headers={"ETag": etag},
+        )
+
+    async def start(self, port: int) -> web.AppRunner:
+        app = web.Application()
+        app.router.add_get("/{slug}", self.handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port).start()
+        return runner
+
+
+# ---- stand-ins for the bot
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+        self.me = type("Me", (), {"color": discord.Color.blue()})()
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int, guild: FakeGuild):
+        self.id = channel_id
+        self.guild = guild
+        self.sent = 0
+
+
+class FakeBot:
+    def __init__(self, loop, channels: List[FakeChannel]):
+        self.loop = loop
+        self.channels = {c.id: c for c in channels}
+        self.db = self
+
+    def guild(self, _guild):
+        return self
+
+    async def embeds(self):
+        return False
+
+    async def wait_until_ready(self):
+        # never ready, the benchmark drives cycles itself
+        await asyncio.Event().wait()
+
+    def get_cog(self, _name):
+        return None
+
+    def get_channel(self, channel_id: int):
+        return self.channels.get(channel_id, None)
+
+    async def send_filtered(self, destination, **kwargs):
+        destination.sent += 1
+
+
+class _MemoryValue:
+    def __init__(self, root: dict, path: list, default):
+        self.root, self.path, self.default = root, path, default
+
+    def _get(self):
+        data = self.root
+        for key in self.path:
+            if key not in data:
+                return copy.deepcopy(self.default)
+            data = data[key]
+        return copy.deepcopy(data)
+
+    def __call__(self):
+        return self
+
+    def __await__(self):
+        async def get():
+            return self._get()
+
+        return get().__await__()
+
+    async def __aenter__(self):
+        self._value = self._get()
+        return self._value
+
+    async def __aexit__(self, *exc_info):
+        await self.set(self._value)
+
+    def __getattr__(self, item):
+        return _MemoryValue(self.root, self.path + [item], {})
+
+    async def set(self, value):
+        data = self.root
+        for key in self.path[:-1]:
+            data = data.setdefault(key, {})
+        data[self.path[-1]] = copy.deepcopy(value)
+
+    async def set_raw(self, *keys, value):
+        await _MemoryValue(self.root, self.path + list(keys), None).set(value)
+
+    async def clear_raw(self, *keys):
+        data = self._get_container(self.path + list(keys[:-1]))
+        data.pop(keys[-1], None)
+
+    def _get_container(self, path):
+        data = self.root
+        for key in path:
+            data = data.setdefault(key, {})
+        return data
+
+
+class MemoryConfig:
+    """
+    Just enough of Red's Config for the RSS cog, kept in memory.
+    """
+
+    @classmethod
+    def get_conf(cls, *args, **kwargs):
+        return cls()
+
+    def __init__(self):
+        self.globals: dict = {}
+        self.global_defaults: dict = {}
+        self.channels: Dict[int, dict] = {}
+        self.channel_defaults: dict = {}
+
+    def register_global(self, **defaults):
+        self.global_defaults.update(defaults)
+
+    def register_channel(self, **defaults):
+        self.channel_defaults.update(defaults)
+
+    def __getattr__(self, item):
+        return _MemoryValue(self.globals, [item], self.global_defaults.get(item))
+
+    def channel(self, channel):
+        data = self.channels.setdefault(
+            channel.id, copy.deepcopy(self.channel_defaults)
+        )
+        return _MemoryValue(data, [], None)
+
+    async def all_channels(self):
+        return copy.deepcopy(self.channels)
+
+
+# ---- measurement
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(time.perf_counter() - start - self.interval)
+
+    def start(self):
+        self.samples = []
+        self._task = asyncio.ensure_future(self._run())
+
+    def stop(self):
+        self._task.cancel()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+def force_all_due(cog):
+    cog.poll_queue = []
+    for url, state in cog.feed_states.items():
+        state.next_poll = 0
+        cog.poll_queue.append((0, url))
+    for health in cog.host_health.values():
+        health.record_success()
+
+
+async def run(args):
+    server = FeedServer(args)
+    runner = await server.start(args.port)
+
+    guilds = [FakeGuild(i) for i in range(1, 11)]
+    channels = [FakeChannel(1000 + i, guilds[i % 10]) for i in range(args.channels)]
+    bot = FakeBot(asyncio.get_event_loop(), channels)
+
+    rss.core.Config = MemoryConfig
+    data_dir = tempfile.TemporaryDirectory()
+    rss.core.cog_data_path = lambda cog: pathlib.Path(data_dir.name)
+    cog = rss.core.RSS(bot)
+    await cog.config.max_concurrency.set(args.concurrency)
+    await cog.config.per_host_concurrency.set(args.concurrency)
+    cog.send_queue.interval = 0
+
+    for index in range(args.feeds):
+        url = "http://127.0.0.1:{}/f{}".format(args.port, index)
+        for offset in range(args.subscribers):
+            channel = channels[(index + offset) % len(channels)]
+            await cog.config.channel(channel).feeds.set_raw(
+                "feed{}".format(index),
+                value={
+                    "url": url,
+                    "template": args.template,
+                    "embed_override": args.embed,
+                    "last": [2017, 7, 14, 0, 0, 0],
+                },
+            )
+
+    latencies: List[float] = []
+    original_fetch = cog.fetch_feed
+
+    async def timed_fetch(*fetch_args, **fetch_kwargs):
+        start = time.perf_counter()
+        try:
+            return await original_fetch(*fetch_args, **fetch_kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    cog.fetch_feed = timed_fetch
+    monitor = LoopLagMonitor()
+
+    print(
+        "{} feeds, {} channels, {} subscriber(s) each, {} entries of ~{} bytes".format(
+            args.feeds, args.channels, args.subscribers, args.entries, args.entry_size
+        )
+    )
+
+    try:
+        for cycle in range(args.cycles):
+            server.cycle = cycle
+            latencies.clear()
+            for channel in channels:
+                channel.sent = 0
+            force_all_due(cog)
+
+            if args.trace_memory:
+                tracemalloc.start()
+            monitor.start()
+            start = time.perf_counter()
+            await cog.do_cycle()
+            elapsed = time.perf_counter() - start
+            monitor.stop()
+            memory = "untraced"
+            if args.trace_memory:
+                _current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                memory = "{:.1f} MiB".format(peak / 2 ** 20)
+
+            print(
+                "cycle {cycle}: {elapsed:.2f}s, fetch p50 {p50:.0f}ms "
+                "p95 {p95:.0f}ms max {fmax:.0f}ms, {posts} posts, "
+                "peak memory {memory}, loop lag p99 {lag99:.1f}ms "
+                "max {lagmax:.1f}ms".format(
+                    cycle=cycle,
+                    elapsed=elapsed,
+                    p50=percentile(latencies, 50) * 1000,
+                    p95=percentile(latencies, 95) * 1000,
+                    fmax=max(latencies or [0]) * 1000,
+                    posts=sum(c.sent for c in channels),
+                    memory=memory,
+                    lag99=percentile(monitor.samples, 99) * 1000,
+                    lagmax=max(monitor.samples or [0]) * 1000,
+                )
+            )
+            if monitor.samples:
+                print(
+                    "    mean loop lag {:.2f}ms over {} samples".format(
+                        statistics.mean(monitor.samples) * 1000, len(monitor.samples)
+                    )
+                )
+    finally:
+        cog.bg_loop_task.cancel()
+        await cog.session.close()
+        if cog._executor:
+            cog._executor.shutdown(wait=True)
+        cog.http_cache.close()
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--feeds", type=int, default=1000)
+    parser.add_argument("--channels", type=int, default=100)
+    parser.add_argument("--subscribers", type=int, default=1, help="channels per feed")
+    parser.add_argument("--entries", type=int, default=20, help="entries per feed")
+    parser.add_argument(
+        "--entry-size", type=int, default=500, help="approximate html bytes per entry"
+    )
+    parser.add_argument(
+        "--new-per-cycle", type=int, default=2, help="new entries each cycle"
+    )
+    parser.add_argument(
+        "--atom-percent", type=int, default=30, help="share of feeds served as atom"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=100, help="mean response latency (ms)"
+    )
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--cycles", type=int, default=3)
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="trace peak memory (this slows everything down considerably)",
+    )
+    parser.add_argument("--template", default=None)
+    parser.add_argument("--embed", action="store_true", default=None)
+    parser.add_argument("--port", type=int, default=8087)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(run(args))
+
+
+if __name__ == "__main__":
+    main()
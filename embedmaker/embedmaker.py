@@ -20,7 +20,7 @@ class EmbedMaker(commands.Cog):
     """
 
     __author__ = "mikeshardmind"
-    __version__ = "3.0.13"
+    __version__ = "3.0.14"
     __flavor_text__ = "Allow yaml file uploads"
 
     def __init__(self, bot):
@@ -1,5 +1,6 @@
 import html.parser
 import re
+from typing import Optional
 
 __all__ = ["html_to_text"]
 
@@ -11,19 +12,29 @@ WhitespaceHandler = re.compile("<p>|<br>|<li>", flags=re.MULTILINE)
 # with some modifications made to better suit the needs of this.
 
 
+class _LimitReached(Exception):
+    pass
+
+
 class HTMLTextExtractor(html.parser.HTMLParser):  # https://stackoverflow.com/a/7778368
     def __init__(self):
         super().__init__()
         self.result = []
+        self.length = 0
+        self.limit: Optional[int] = None
 
     def handle_data(self, d):
         self.result.append(d)
+        self.length += len(d)
+        if self.limit is not None and self.length >= self.limit:
+            raise _LimitReached()
 
     def get_text(self):
         return "".join(self.result)
 
 
-def html_to_text(html_data):  # https://stackoverflow.com/a/7778368
+# https://stackoverflow.com/a/7778368
+def html_to_text(html_data, limit: Optional[int] = None):
     """Converts HTML to plain text (stripping tags and converting entities).
     >>> html_to_text('<a href="#">Demo<!--...--> <em>(&not; \u0394&#x03b7;&#956;&#x03CE;)</em></a>')
     'Demo (\xac \u0394\u03b7\u03bc\u03ce)'
@@ -42,8 +53,22 @@ def html_to_text(html_data):  # https://stackoverflow.com/a/7778368
     despite being XML only.
     >>> html_to_text('&nosuchentity; &apos; ')
     "&nosuchentity; ' "
+
+    If a limit is given, parsing stops once the output reaches it,
+    and the output is cut to that length.
+    >>> html_to_text('<b>abc</b>def', limit=2)
+    'ab'
     """
+    if "<" not in html_data and "&" not in html_data:
+        # Nothing to strip or convert
+        return html_data if limit is None else html_data[:limit]
+
     html_data = WhitespaceHandler.sub("\n", html_data)
     s = HTMLTextExtractor()
-    s.feed(html_data)
-    return s.get_text()
+    s.limit = limit
+    try:
+        s.feed(html_data)
+    except _LimitReached:
+        pass
+    text = s.get_text()
+    return text if limit is None else text[:limit]
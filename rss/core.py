@@ -1,7 +1,20 @@
 import asyncio
+import functools
+import hashlib
+import heapq
+import io
 import string
-from typing import Optional, List, cast, no_type_check
+import time
+from collections import defaultdict
+from concurrent.futures import (
+    BrokenExecutor,
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import AsyncIterator, Dict, Iterable, Optional, List, Tuple, no_type_check
 from datetime import datetime
+from urllib.parse import urlsplit
 
 import aiohttp
 import feedparser
@@ -9,11 +22,16 @@ import discord
 
 from redbot.core import commands, checks
 from redbot.core.config import Config
+from redbot.core.data_manager import cog_data_path
 from redbot.core.i18n import Translator, cog_i18n
 from redbot.core.utils.chat_formatting import pagify
 
 from .cleanup import html_to_text
 from .converters import tristate  # typing: ignore
+from .feedstate import FeedState, HostHealth, SeenEntries, entry_key
+from .httpcache import HTTPCache
+from .opml import build_opml, parse_opml
+from .sendqueue import SendQueue
 
 
 T_ = Translator("RSS", __file__)
@@ -24,6 +42,13 @@ _ = lambda s: s
 #
 _ = T_
 
+# How long the loop may sleep, and how long subscriptions are kept without
+# re-reading config, as not every change to them goes through this cog.
+IDLE_RECHECK = 60
+
+# Posts are cut well before this, so nothing past it in a field is ever shown.
+FIELD_LIMIT = 2000
+
 DONT_HTML_SCRUB = ["link", "source", "updated", "updated_parsed"]
 
 USABLE_FIELDS = [
@@ -51,6 +76,51 @@ USABLE_FIELDS = [
 ]
 
 
+# The below are run in an executor, and need to remain importable at module level
+# so that they can be used with a process pool.
+
+
+def parse_feed(data: bytes) -> Optional[feedparser.FeedParserDict]:
+    ret = feedparser.parse(data)
+    if ret.bozo:
+        # This also avoids shipping an unpicklable exception back from a process.
+        return None
+    return ret
+
+
+@functools.lru_cache(maxsize=512)
+def compile_template(template: str) -> Tuple[string.Template, Tuple[str, ...]]:
+    """
+    Parses a template once, noting which of the usable fields it actually uses.
+    """
+    compiled = string.Template(template)
+    used = {
+        match.group("named") or match.group("braced")
+        for match in compiled.pattern.finditer(template)
+    }
+    return compiled, tuple(k for k in USABLE_FIELDS if k in used)
+
+
+def not_modified() -> feedparser.FeedParserDict:
+    return feedparser.FeedParserDict(entries=[], bozo=0, status=304)
+
+
+def render_template(template: str, entry: feedparser.FeedParserDict) -> str:
+
+    compiled, fields = compile_template(template)
+
+    escaped_usable_fields = {}
+    for key in fields:
+        val = getattr(entry, key, None)
+        if not val:
+            continue
+        if isinstance(val, str) and key not in DONT_HTML_SCRUB:
+            val = html_to_text(val, limit=FIELD_LIMIT)
+        escaped_usable_fields[key] = val
+
+    return compiled.safe_substitute(escaped_usable_fields)
+
+
 @cog_i18n(_)
 class RSS(commands.Cog):
     """
@@ -60,7 +130,7 @@ class RSS(commands.Cog):
     """
 
     __author__ = "mikeshardmind(Sinbad)"
-    __version__ = "1.0.22"
+    __version__ = "1.4.5"
     __flavor_text__ = "Slow responses wont kill the loop now."
 
     def __init__(self, bot):
@@ -69,12 +139,36 @@ class RSS(commands.Cog):
             self, identifier=78631113035100160, force_registration=True
         )
         self.config.register_channel(feeds={})
+        self.config.register_global(
+            max_concurrency=20,
+            per_host_concurrency=4,
+            use_processes=False,
+            min_interval=300,
+            max_interval=6 * 60 * 60,
+            max_body_size=4 * 1024 * 1024,
+        )
         self.session = aiohttp.ClientSession()
+        self.feed_states: Dict[str, FeedState] = {}
+        self.poll_queue: List[Tuple[float, str]] = []
+        self.seen_entries: Dict[Tuple[int, str], SeenEntries] = {}
+        self.host_health: Dict[Optional[str], HostHealth] = {}
+        self.send_queue = SendQueue(bot)
+        self.http_cache = HTTPCache(cog_data_path(self) / "http_cache.sqlite3")
+        self._http_cache_loaded = False
+        # url -> subscribers, rebuilt from config when stale
+        self._subscriptions: Optional[Dict[str, list]] = None
+        self._subscriptions_expire = 0.0
+        self._executor: Optional[Executor] = None
+        self._executor_uses_processes = False
         self.bg_loop_task = self.bot.loop.create_task(self.bg_loop())
 
     def __unload(self):
         self.bg_loop_task.cancel()
         self.bot.loop.create_task(self.session.close())
+        if self._executor:
+            self._executor.shutdown(wait=False)
+        # The cancelled cycle still saves what it polled on the way out.
+        self.bg_loop_task.add_done_callback(lambda _task: self.http_cache.close())
 
     __del__ = __unload
     # This really shouldn't be neccessary, but I'll verify this later.
@@ -83,27 +177,163 @@ class RSS(commands.Cog):
         """
         This is abuse.
         """
+        self.seen_entries.pop((channel.id, feedname), None)
+        self.invalidate_subscriptions()
         return self.config.channel(channel).clear_raw("feeds", feedname)
 
+    def invalidate_subscriptions(self):
+        """
+        Call after changing feed settings, so the next cycle re-reads them.
+        """
+        self._subscriptions = None
+
     async def should_embed(self, guild: discord.Guild) -> bool:
         guild_setting = await self.bot.db.guild(guild).embeds()
         if guild_setting is not None:
             return guild_setting
         return await self.bot.db.embeds()
 
-    async def fetch_feed(self, url: str) -> Optional[feedparser.FeedParserDict]:
+    async def prepare_executor(self):
+        """
+        (Re)creates the executor used for parsing if the setting for it changed.
+        """
+        use_processes = await self.config.use_processes()
+        if self._executor and use_processes == self._executor_uses_processes:
+            return
+
+        if self._executor:
+            self._executor.shutdown(wait=False)
+
+        if use_processes:
+            self._executor = ProcessPoolExecutor(max_workers=2)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=4)
+        self._executor_uses_processes = use_processes
+
+    async def run_blocking(self, func, *args):
+        if self._executor is None:
+            await self.prepare_executor()
+        executor = self._executor
+        try:
+            return await self.bot.loop.run_in_executor(executor, func, *args)
+        except BrokenExecutor:
+            # A worker process died, which leaves the whole pool unusable,
+            # so it's replaced for whatever runs next before this is raised.
+            if self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False)
+            raise
+
+    async def fetch_feed(
+        self,
+        url: str,
+        state: Optional[FeedState] = None,
+        health: Optional[HostHealth] = None,
+    ) -> Optional[feedparser.FeedParserDict]:
+        """
+        Fetches and parses a feed.
+
+        If a state is provided, the request is made conditional on it,
+        and a feed which hasn't changed comes back without any entries.
+
+        If the host's health is provided, the outcome is recorded to it.
+        Only errors which indicate a problem with the host count as failures.
+        """
         timeout = aiohttp.client.ClientTimeout(total=15)
+        max_size = await self.config.max_body_size()
+        headers = {"Accept-Encoding": "gzip, deflate"}
+        if state:
+            headers.update(state.conditional_headers)
         try:
-            async with self.session.get(url, timeout=timeout) as response:
-                data = await response.read()
+            async with self.session.get(
+                url, timeout=timeout, headers=headers
+            ) as response:
+                if state:
+                    state.update_cache_hint(response.headers)
+                if response.status >= 500 or response.status == 429:
+                    if health:
+                        health.record_failure(time.monotonic())
+                    return None
+                if health:
+                    health.record_success()
+                if state and response.status == 304:
+                    return not_modified()
+                if (response.content_length or 0) > max_size:
+                    return None
+                # The body is decompressed as it streams, so the cap applies after that.
+                chunks = []
+                size = 0
+                async for chunk in response.content.iter_chunked(1 << 16):
+                    size += len(chunk)
+                    if size > max_size:
+                        return None
+                    chunks.append(chunk)
+                data = b"".join(chunks)
+                response_headers = response.headers
         except (aiohttp.ClientError, asyncio.TimeoutError):
+            if health:
+                health.record_failure(time.monotonic())
             return None
 
-        ret = feedparser.parse(data)
-        if ret.bozo:
+        if state:
+            body_hash = hashlib.sha1(data).hexdigest()
+            if body_hash == state.body_hash:
+                # For servers which don't support conditional requests
+                state.update_validators(response_headers)
+                return not_modified()
+
+        try:
+            ret = await self.run_blocking(parse_feed, data)
+        except BrokenExecutor:
+            return None
+        if ret is None:
             return None
+        if state:
+            state.body_hash = body_hash
+            state.update_validators(response_headers)
+            state.update_from_feed(ret)
         return ret
 
+    async def fetch_many(
+        self, urls: Iterable[str], *, track: bool = True
+    ) -> AsyncIterator[Tuple[str, Optional[feedparser.FeedParserDict]]]:
+        """
+        Fetches feeds concurrently, yielding (url, response) as each one finishes.
+
+        Concurrency is capped both globally and per host.
+
+        When tracking, the per url state and per host health are used and updated,
+        which should only be done when polling subscribed feeds.
+        """
+        max_concurrency = await self.config.max_concurrency()
+        per_host = await self.config.per_host_concurrency()
+
+        global_semaphore = asyncio.Semaphore(max_concurrency)
+        host_semaphores: Dict[Optional[str], asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(per_host)
+        )
+
+        async def bounded_fetch(url: str):
+            host = urlsplit(url).hostname
+            state = health = None
+            if track:
+                health = self.host_health.setdefault(host, HostHealth())
+                state = self.feed_states.setdefault(url, FeedState())
+                if not health.allow_request(time.monotonic()):
+                    return url, None
+            # host first, so feeds waiting on a busy host don't hold a global slot
+            async with host_semaphores[host]:
+                async with global_semaphore:
+                    return url, await self.fetch_feed(url, state, health)
+
+        tasks = [asyncio.ensure_future(bounded_fetch(url)) for url in urls]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
     @staticmethod
     def process_entry_time(x):
         if "published_parsed" in x:
@@ -112,6 +342,29 @@ class RSS(commands.Cog):
             return tuple(x.get("updated_parsed"))[:5]
         return (0,)
 
+    def get_seen_entries(
+        self, channel: discord.TextChannel, feed_name: str, feed: dict, response
+    ) -> SeenEntries:
+        """
+        Gets the index of seen entries for a subscription,
+        building it from the stored one, or from the legacy timestamp if needed.
+        """
+        key = (channel.id, feed_name)
+        seen = self.seen_entries.get(key, None)
+        if seen is None:
+            if "seen" in feed:
+                seen = SeenEntries(feed["seen"])
+            else:
+                last = tuple((feed.get("last", None) or (0,))[:5])
+                seen = SeenEntries(
+                    entry_key(e)
+                    for e in response.entries
+                    if self.process_entry_time(e) <= last
+                )
+                seen.dirty = True
+            self.seen_entries[key] = seen
+        return seen
+
     async def format_and_send(
         self,
         *,
@@ -120,10 +373,19 @@ class RSS(commands.Cog):
         feed_settings: dict,
         embed_default: bool,
         force: bool = False,
+        seen: Optional[SeenEntries] = None,
+        rendered: Optional[dict] = None,
     ) -> Optional[List[int]]:
         """
         Formats and sends, 
         returns the integer timestamp of latest entry in the feed which was sent
+
+        If an index of seen entries is provided, 
+        it is used (and updated) to determine which entries are new.
+        Otherwise, entries are compared to the stored timestamp.
+
+        If a dict is provided for rendered, 
+        it's used to share rendered entries with other subscriptions to the same feed.
         """
 
         use_embed = feed_settings.get("embed_override", None)
@@ -135,6 +397,11 @@ class RSS(commands.Cog):
                 to_send = [response.entries[0]]
             except IndexError:
                 return None
+        elif seen is not None:
+            # feeds list newest first, this keeps undated entries in a sane order.
+            to_send = sorted(
+                reversed(seen.update(response.entries)), key=self.process_entry_time
+            )
         else:
             last = feed_settings.get("last", None)
             last = tuple((last or (0,))[:5])
@@ -144,21 +411,29 @@ class RSS(commands.Cog):
                 key=self.process_entry_time,
             )
 
-        last_sent = None
-        for entry in to_send:
-            color = destination.guild.me.color
-            kwargs = self.format_post(
-                entry, use_embed, color, feed_settings.get("template", None)
+        color = destination.guild.me.color
+        payloads = [
+            await self.format_post(
+                entry,
+                use_embed,
+                color,
+                feed_settings.get("template", None),
+                rendered=rendered,
             )
-            try:
-                await self.bot.send_filtered(destination, **kwargs)
-            except discord.HTTPException:
-                continue
-            last_sent = list(self.process_entry_time(entry))
+            for entry in to_send
+        ]
+
+        last_sent = None
+        delivered = await self.send_queue.send_many(destination, payloads)
+        for entry, was_sent in zip(to_send, delivered):
+            if was_sent:
+                last_sent = list(self.process_entry_time(entry))
 
         return last_sent
 
-    def format_post(self, entry, embed: bool, color, template=None) -> dict:
+    async def format_post(
+        self, entry, embed: bool, color, template=None, rendered: Optional[dict] = None
+    ) -> dict:
 
         if template is None:
             if embed:
@@ -168,27 +443,25 @@ class RSS(commands.Cog):
         else:
             _template = template
 
-        template = string.Template(_template)
-
-        data = {k: getattr(entry, k, None) for k in USABLE_FIELDS}
-
-        def maybe_clean(key, val):
-            if isinstance(val, str) and key not in DONT_HTML_SCRUB:
-                return html_to_text(val)
-            return val
-
-        escaped_usable_fields = {k: maybe_clean(k, v) for k, v in data.items() if v}
-
-        content = template.safe_substitute(**escaped_usable_fields)
+        if rendered is None:
+            content = await self.run_blocking(render_template, _template, entry)
+        else:
+            # Futures are stored so concurrent subscribers wait on a single render.
+            cache_key = (entry_key(entry), _template)
+            if cache_key not in rendered:
+                rendered[cache_key] = asyncio.ensure_future(
+                    self.run_blocking(render_template, _template, entry)
+                )
+            content = await rendered[cache_key]
 
         if embed:
             if len(content) > 1980:
                 content = content[:1900] + _("... (Feed data too long)")
-            timestamp = datetime(*self.process_entry_time(entry))
-            embed_data = discord.Embed(
-                description=content, color=color, timestamp=timestamp
-            )
-            embed_data.set_footer(text=_("Published "))
+            entry_time = self.process_entry_time(entry)
+            embed_data = discord.Embed(description=content, color=color)
+            if len(entry_time) > 1:  # undated entries get (0,)
+                embed_data.timestamp = datetime(*entry_time)
+                embed_data.set_footer(text=_("Published "))
             return {"content": None, "embed": embed_data}
         else:
             if len(content) > 1950:
@@ -198,47 +471,207 @@ class RSS(commands.Cog):
     async def bg_loop(self):
         await self.bot.wait_until_ready()
         while self.bot.get_cog("RSS") == self:
-            feeds_fetched = {}
-            default_embed_settings = {}
+            await self.do_cycle()
+            await asyncio.sleep(self.time_until_next_poll())
+
+    def time_until_next_poll(self) -> float:
+        if not self.poll_queue:
+            return IDLE_RECHECK
+        delay = self.poll_queue[0][0] - time.monotonic()
+        return min(max(delay, 1), IDLE_RECHECK)
+
+    def pop_due_urls(self, subscribed) -> List[str]:
+        """
+        Gets the urls which are due to be polled, including any newly subscribed ones.
+        """
+        due = [url for url in subscribed if url not in self.feed_states]
+        now = time.monotonic()
+        while self.poll_queue and self.poll_queue[0][0] <= now:
+            when, url = heapq.heappop(self.poll_queue)
+            state = self.feed_states.get(url, None)
+            # Entries for removed (or removed and re-added) feeds are stale
+            if url in subscribed and state and state.next_poll == when:
+                due.append(url)
+        return due
+
+    async def load_http_cache(self, subscribed):
+        """
+        Restores feed states saved before a restart,
+        so that it isn't followed by a burst of full fetches of every feed.
+        """
+        rows = await self.http_cache.load()
+        now = time.monotonic()
+        for url, row in rows.items():
+            if url in subscribed and url not in self.feed_states:
+                state = self.feed_states[url] = FeedState.from_cache(row, now)
+                heapq.heappush(self.poll_queue, (state.next_poll, url))
+        await self.http_cache.delete(rows.keys() - subscribed.keys())
+        self._http_cache_loaded = True
+
+    async def get_subscriptions(self) -> Dict[str, list]:
+        """
+        Gets each feed url's subscribers, only reading config when the
+        feed settings were changed or the last read has expired.
+        """
+        if (
+            self._subscriptions is not None
+            and time.monotonic() < self._subscriptions_expire
+        ):
+            return self._subscriptions
+
+        subscriptions: Dict[str, list] = defaultdict(list)
+        default_embed_settings = {}
+
+        await self.prepare_executor()
+
+        channel_data = await self.config.all_channels()
+        for channel_id, data in channel_data.items():
+
+            channel = self.bot.get_channel(channel_id)
+            if not channel:
+                continue
+            if channel.guild not in default_embed_settings:
+                should_embed = await self.should_embed(channel.guild)
+                default_embed_settings[channel.guild] = should_embed
+            else:
+                should_embed = default_embed_settings[channel.guild]
+
+            for feed_name, feed in data["feeds"].items():
+                url = feed.get("url", None)
+                if not url:
+                    continue
+                subscriptions[url].append((channel, feed_name, feed, should_embed))
+
+        if not self._http_cache_loaded:
+            await self.load_http_cache(subscriptions)
+        await self.prune_state(subscriptions)
+
+        self._subscriptions = subscriptions
+        self._subscriptions_expire = time.monotonic() + IDLE_RECHECK
+        return subscriptions
+
+    async def prune_state(self, subscriptions: Dict[str, list]):
+        """
+        Drops state kept for feeds which are no longer subscribed to.
+        """
+        stale_urls = self.feed_states.keys() - subscriptions.keys()
+        for stale_url in stale_urls:
+            del self.feed_states[stale_url]
+        await self.http_cache.delete(stale_urls)
+
+        hosts = {urlsplit(url).hostname for url in subscriptions}
+        for stale_host in self.host_health.keys() - hosts:
+            del self.host_health[stale_host]
+
+        current = {
+            (channel.id, feed_name)
+            for subscribers in subscriptions.values()
+            for channel, feed_name, _feed, _embed in subscribers
+        }
+        for stale_key in self.seen_entries.keys() - current:
+            del self.seen_entries[stale_key]
+
+    async def do_cycle(self):
+        """
+        Fetches each feed which is due, posting to channels as results arrive.
+        """
+        subscriptions = await self.get_subscriptions()
+
+        minimum = await self.config.min_interval()
+        maximum = await self.config.max_interval()
 
-            channel_data = await self.config.all_channels()
-            for channel_id, data in channel_data.items():
+        # channel -> feed name -> settings to update, written once per channel
+        updates: Dict[discord.TextChannel, Dict[str, dict]] = defaultdict(
+            lambda: defaultdict(dict)
+        )
+
+        posting: List[asyncio.Future] = []
+        polled: List[str] = []
+        try:
+            async for url, response in self.fetch_many(
+                self.pop_due_urls(subscriptions)
+            ):
+                polled.append(url)
+                state = self.feed_states[url]
+                unchanged = response and (
+                    response.get("status", None) == 304 or not state.has_new_entries
+                )
+                next_poll = state.reschedule(
+                    time.monotonic(), minimum, maximum, backoff=bool(unchanged)
+                )
+                health = self.host_health[urlsplit(url).hostname]
+                if health.failures:
+                    next_poll = state.next_poll = max(next_poll, health.retry_at)
+                heapq.heappush(self.poll_queue, (next_poll, url))
 
-                channel = self.bot.get_channel(channel_id)
-                if not channel:
+                if not response or not response.entries:
                     continue
-                if channel.guild not in default_embed_settings:
-                    should_embed = await self.should_embed(channel.guild)
-                    default_embed_settings[channel.guild] = should_embed
-                else:
-                    should_embed = default_embed_settings[channel.guild]
-
-                for feed_name, feed in data["feeds"].items():
-                    url = feed.get("url", None)
-                    if not url:
-                        continue
-                    if url in feeds_fetched:
-                        response = feeds_fetched[url]
-                    else:
-                        response = await self.fetch_feed(url)
-                        feeds_fetched[url] = response
-
-                    if response:
-                        try:
-                            last = await self.format_and_send(
-                                destination=channel,
-                                response=response,
-                                feed_settings=feed,
-                                embed_default=should_embed,
-                            )
-                        except Exception:
-                            pass
-                        else:
-                            if last:
-                                await self.config.channel(channel).feeds.set_raw(
-                                    feed_name, "last", value=last
-                                )
-            await asyncio.sleep(600)  # TODO: configureable
+                posting.append(
+                    asyncio.ensure_future(
+                        self.post_to_subscribers(response, subscriptions[url], updates)
+                    )
+                )
+            await asyncio.gather(*posting)
+        except asyncio.CancelledError:
+            for task in posting:
+                task.cancel()
+            raise
+        finally:
+            await self.write_updates(updates)
+            now = time.monotonic()
+            await self.http_cache.save(
+                {
+                    url: self.feed_states[url].to_cache(now)
+                    for url in polled
+                    if url in self.feed_states
+                }
+            )
+
+    async def post_to_subscribers(
+        self,
+        response: feedparser.FeedParserDict,
+        subscribers: list,
+        updates: Dict[discord.TextChannel, Dict[str, dict]],
+    ):
+        """
+        Posts new entries of a fetched feed to each of its subscribers concurrently.
+        """
+        # (entry, template) -> rendered content, shared by every subscriber
+        rendered: dict = {}
+
+        async def post(channel, feed_name, feed, should_embed):
+            seen = self.get_seen_entries(channel, feed_name, feed, response)
+            try:
+                last = await self.format_and_send(
+                    destination=channel,
+                    response=response,
+                    feed_settings=feed,
+                    embed_default=should_embed,
+                    seen=seen,
+                    rendered=rendered,
+                )
+            except Exception:
+                pass
+            else:
+                if last:
+                    updates[channel][feed_name]["last"] = last
+            if seen.dirty:
+                updates[channel][feed_name]["seen"] = seen.to_config()
+                seen.dirty = False
+
+        await asyncio.gather(*(post(*subscriber) for subscriber in subscribers))
+
+    async def write_updates(self, updates: Dict[discord.TextChannel, Dict[str, dict]]):
+        """
+        Writes updates to feed settings, with a single write per channel.
+
+        Feeds which were removed in the meantime are left removed.
+        """
+        for channel, feed_updates in updates.items():
+            async with self.config.channel(channel).feeds() as feeds:
+                for feed_name, to_update in feed_updates.items():
+                    if feed_name in feeds:
+                        feeds[feed_name].update(to_update)
 
     # commands go here
 
@@ -250,6 +683,117 @@ class RSS(commands.Cog):
         """
         pass
 
+    @checks.is_owner()
+    @commands.group()
+    async def rssset(self, ctx: commands.Context):
+        """
+        Global settings for rss
+        """
+        pass
+
+    @rssset.command(name="concurrency")
+    async def rssset_concurrency(
+        self, ctx: commands.Context, max_concurrent: int, per_host: int
+    ):
+        """
+        Sets how many feeds may be fetched at once, in total and per host.
+
+        Defaults are 20 in total, and 4 per host.
+        """
+        if max_concurrent < 1 or per_host < 1:
+            return await ctx.send(_("Both limits need to be at least 1."))
+
+        await self.config.max_concurrency.set(max_concurrent)
+        await self.config.per_host_concurrency.set(per_host)
+        await ctx.tick()
+
+    @rssset.command(name="executor")
+    async def rssset_executor(self, ctx: commands.Context, kind: str):
+        """
+        Sets whether feed parsing and html cleanup happen in threads or processes.
+
+        Valid settings are "thread" (default) and "process".
+        Processes avoid contention with the bot for large feeds,
+        at the cost of some memory and copying feed data between them.
+        """
+        kind = kind.lower()
+        if kind not in ("thread", "process"):
+            return await ctx.send(_('Valid settings are "thread" or "process".'))
+
+        await self.config.use_processes.set(kind == "process")
+        await self.prepare_executor()
+        await ctx.tick()
+
+    @rssset.command(name="interval")
+    async def rssset_interval(
+        self, ctx: commands.Context, minimum_minutes: int, maximum_minutes: int
+    ):
+        """
+        Sets the bounds on how often each feed is polled, in minutes.
+
+        Each feed is polled based on how often it publishes,
+        and any hints provided by the feed about polling it.
+        This sets the range that is allowed to fall in.
+
+        Defaults are 5 minutes and 360 minutes.
+        """
+        if not 1 <= minimum_minutes <= maximum_minutes:
+            return await ctx.send(
+                _("The minimum needs to be at least 1, and no more than the maximum.")
+            )
+
+        await self.config.min_interval.set(minimum_minutes * 60)
+        await self.config.max_interval.set(maximum_minutes * 60)
+        await ctx.tick()
+
+    @rssset.command(name="maxsize")
+    async def rssset_maxsize(self, ctx: commands.Context, kilobytes: int):
+        """
+        Sets the largest (decompressed) feed which will be downloaded, in KiB.
+
+        Feeds larger than this are skipped. Default is 4096 (4 MiB)
+        """
+        if kilobytes < 1:
+            return await ctx.send(_("That needs to be at least 1."))
+
+        await self.config.max_body_size.set(kilobytes * 1024)
+        await ctx.tick()
+
+    @rss.command(name="health")
+    async def rss_health(self, ctx: commands.Context):
+        """
+        Lists feeds in this server which are being backed off from due to failures.
+        """
+        now = time.monotonic()
+        lines = []
+        channel_data = await self.config.all_channels()
+        for channel in ctx.guild.text_channels:
+            feeds = channel_data.get(channel.id, {}).get("feeds", {})
+            for name, feed in feeds.items():
+                host = urlsplit(feed.get("url", None) or "").hostname
+                health = self.host_health.get(host, None)
+                if not (health and health.failures):
+                    continue
+                lines.append(
+                    _(
+                        "{name} in {channel} ({host}): {failures} failure(s), "
+                        "circuit {state}, next attempt in {minutes} minute(s)"
+                    ).format(
+                        name=name,
+                        channel=channel.mention,
+                        host=host,
+                        failures=health.failures,
+                        state=health.state(now),
+                        minutes=max(int((health.retry_at - now) // 60), 0),
+                    )
+                )
+
+        if not lines:
+            return await ctx.send(_("No feeds here are backing off."))
+
+        for page in pagify("\n".join(lines)):
+            await ctx.send(page)
+
     @rss.command(name="force")
     async def rss_force(self, ctx, feed, channel: Optional[discord.TextChannel] = None):
         """
@@ -322,8 +866,93 @@ class RSS(commands.Cog):
                     }
                 )
 
+        self.invalidate_subscriptions()
         await ctx.tick()
 
+    @rss.command(name="import")
+    async def import_feeds(
+        self, ctx: commands.Context, channel: Optional[discord.TextChannel] = None
+    ):
+        """
+        Imports feeds from an attached OPML file to the current, or a provided channel
+
+        Feeds which can't be fetched, or are already in the channel, are skipped.
+        """
+        channel = channel or ctx.channel
+
+        if not ctx.message.attachments:
+            return await ctx.send(_("You need to attach an OPML file to import."))
+
+        attachment = ctx.message.attachments[0]
+        if attachment.size > 1024 * 1024:
+            return await ctx.send(_("That file is too large."))
+
+        buffer = io.BytesIO()
+        await attachment.save(buffer)
+        try:
+            outlines = parse_opml(buffer.getvalue())
+        except ValueError:
+            return await ctx.send(_("That doesn't seem to be a valid OPML file."))
+
+        existing = await self.config.channel(channel).feeds()
+        existing_urls = {feed.get("url", None) for feed in existing.values()}
+        names = {}
+        for name, url in outlines:
+            if url in existing_urls or url in names:
+                continue
+            candidate, suffix = name, 1
+            while candidate in existing or candidate in names.values():
+                suffix += 1
+                candidate = f"{name}-{suffix}"
+            names[url] = candidate
+
+        if not names:
+            return await ctx.send(_("There were no new feeds to import."))
+
+        async with ctx.typing():
+            valid = [
+                url
+                async for url, response in self.fetch_many(names, track=False)
+                if response is not None
+            ]
+
+        last = list(ctx.message.created_at.timetuple()[:6])
+        async with self.config.channel(channel).feeds() as feeds:
+            for url in valid:
+                if names[url] not in feeds:
+                    feeds[names[url]] = {
+                        "url": url,
+                        "template": None,
+                        "embed_override": None,
+                        "last": last,
+                    }
+        self.invalidate_subscriptions()
+
+        await ctx.send(
+            _("Imported {valid} feed(s). {invalid} couldn't be fetched.").format(
+                valid=len(valid), invalid=len(names) - len(valid)
+            )
+        )
+
+    @rss.command(name="export")
+    async def export_feeds(
+        self, ctx: commands.Context, channel: Optional[discord.TextChannel] = None
+    ):
+        """
+        Exports the feeds in the current, or a provided channel as an OPML file
+        """
+        channel = channel or ctx.channel
+
+        data = await self.config.channel(channel).feeds()
+        feeds = {k: v["url"] for k, v in data.items() if v.get("url", None)}
+        if not feeds:
+            return await ctx.send(_("There are no feeds to export."))
+
+        opml = build_opml(feeds, title=f"{ctx.guild.name} #{channel.name}")
+        await ctx.send(
+            file=discord.File(io.BytesIO(opml), filename=f"{channel.name}.opml")
+        )
+
     @rss.command(name="list")
     async def list_feeds(
         self, ctx: commands.Context, channel: Optional[discord.TextChannel] = None
@@ -398,6 +1027,7 @@ class RSS(commands.Cog):
         await self.config.channel(channel).set_raw(
             "feeds", feed, "embed_override", value=setting
         )
+        self.invalidate_subscriptions()
         await ctx.tick()
 
     @rss.command(name="template")
@@ -447,6 +1077,7 @@ class RSS(commands.Cog):
         await self.config.channel(channel).set_raw(
             "feeds", feed, "template", value=template
         )
+        self.invalidate_subscriptions()
         await ctx.tick()
 
     @rss.command(name="resettemplate")
@@ -458,4 +1089,5 @@ class RSS(commands.Cog):
         """
         channel = channel or ctx.channel
         await self.config.channel(channel).clear_raw("feeds", feed, "template")
+        self.invalidate_subscriptions()
         await ctx.tick()
@@ -0,0 +1,269 @@
+import calendar
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+__all__ = ["FeedState", "HostHealth", "SeenEntries", "entry_key", "DEFAULT_INTERVAL"]
+
+DEFAULT_INTERVAL = 600
+
+# Minimum number of entry keys remembered per subscription
+SEEN_LIMIT = 200
+
+MAX_AGE_RE = re.compile(r"(?:s-)?max-age\s*=\s*(\d+)", flags=re.IGNORECASE)
+
+# Consecutive failures before a host's circuit opens
+FAILURE_THRESHOLD = 3
+BACKOFF_BASE = 60
+BACKOFF_MAX = 60 * 60 * 24
+# How long a single trial request holds a half-open circuit
+TRIAL_WINDOW = 60
+
+SY_PERIODS = {
+    "hourly": 60 * 60,
+    "daily": 60 * 60 * 24,
+    "weekly": 60 * 60 * 24 * 7,
+    "monthly": 60 * 60 * 24 * 30,
+    "yearly": 60 * 60 * 24 * 365,
+}
+
+
+class FeedState:
+    """
+    Bookkeeping for a single feed url which is kept between polling cycles.
+    """
+
+    __slots__ = (
+        "etag",
+        "last_modified",
+        "interval",
+        "next_poll",
+        "publish_gap",
+        "feed_hint",
+        "cache_hint",
+        "body_hash",
+        "entry_ids",
+        "has_new_entries",
+    )
+
+    def __init__(self):
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.interval: float = DEFAULT_INTERVAL
+        self.next_poll: float = 0
+        self.publish_gap: Optional[float] = None
+        self.feed_hint: Optional[float] = None
+        self.cache_hint: Optional[float] = None
+        self.body_hash: Optional[str] = None
+        self.entry_ids: FrozenSet[str] = frozenset()
+        self.has_new_entries = True
+
+    @classmethod
+    def from_cache(cls, row: dict, now: float) -> "FeedState":
+        """
+        Restores a state saved with to_cache. now is the current monotonic time.
+        """
+        state = cls()
+        state.etag = row["etag"]
+        state.last_modified = row["last_modified"]
+        state.body_hash = row["body_hash"]
+        state.entry_ids = frozenset(row["entry_ids"])
+        state.interval = row["interval"]
+        state.next_poll = now + max(row["next_poll_at"] - time.time(), 0)
+        return state
+
+    def to_cache(self, now: float) -> dict:
+        """
+        Gets what's worth keeping across restarts. now is the current monotonic time.
+        """
+        return {
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "body_hash": self.body_hash,
+            "entry_ids": sorted(self.entry_ids),
+            "interval": self.interval,
+            # monotonic time is meaningless across restarts
+            "next_poll_at": time.time() + (self.next_poll - now),
+        }
+
+    @property
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def update_validators(self, headers) -> None:
+        self.etag = headers.get("ETag", None)
+        self.last_modified = headers.get("Last-Modified", None)
+
+    def update_cache_hint(self, headers) -> None:
+        match = MAX_AGE_RE.search(headers.get("Cache-Control", ""))
+        self.cache_hint = int(match.group(1)) if match else None
+
+    def update_from_feed(self, response) -> None:
+        """
+        Picks up the publisher's polling hints and publishing rate from a parsed feed.
+        """
+        feed = response.get("feed", {})
+
+        hint = None
+        try:
+            hint = int(feed["ttl"]) * 60
+        except (KeyError, ValueError, TypeError):
+            pass
+
+        period = SY_PERIODS.get(feed.get("sy_updateperiod", "").strip().lower())
+        if period:
+            try:
+                frequency = max(int(feed.get("sy_updatefrequency", 1)), 1)
+            except (ValueError, TypeError):
+                frequency = 1
+            hint = max(hint or 0, period // frequency)
+
+        self.feed_hint = hint
+
+        entry_ids = frozenset(entry_key(e) for e in response.entries)
+        self.has_new_entries = bool(entry_ids - self.entry_ids)
+        self.entry_ids = entry_ids
+
+        stamps = sorted(
+            (
+                calendar.timegm(t)
+                for t in (
+                    e.get("published_parsed", None) or e.get("updated_parsed", None)
+                    for e in response.entries
+                )
+                if t
+            ),
+            reverse=True,
+        )[:10]
+
+        if len(stamps) > 1:
+            average_gap = (stamps[0] - stamps[-1]) / (len(stamps) - 1)
+            # A feed which used to be busy, but has since gone quiet should slow down.
+            self.publish_gap = max(average_gap, (time.time() - stamps[0]) / 2)
+
+    def reschedule(
+        self, now: float, minimum: float, maximum: float, *, backoff: bool = False
+    ) -> float:
+        """
+        Works out when this should be polled next, and returns that time.
+
+        Feeds are polled about twice per observed publishing interval,
+        but never sooner than the publisher has asked for, and within the bounds given.
+        """
+
+        if backoff:
+            interval = self.interval * 1.25
+        elif self.publish_gap is not None:
+            interval = self.publish_gap / 2
+        else:
+            interval = self.interval
+
+        for hint in (self.feed_hint, self.cache_hint):
+            if hint:
+                interval = max(interval, hint)
+
+        self.interval = min(max(interval, minimum), maximum)
+        self.next_poll = now + self.interval
+        return self.next_poll
+
+
+class HostHealth:
+    """
+    Failure tracking for a single host, acting as a circuit breaker.
+
+    Each consecutive failure doubles how long the host is left alone.
+    Once enough have happened, the circuit opens and nothing is fetched from it
+    until the backoff expires, at which point a single trial request is allowed.
+    A success at any point closes the circuit again.
+    """
+
+    __slots__ = ("failures", "retry_at")
+
+    def __init__(self):
+        self.failures: int = 0
+        self.retry_at: float = 0
+
+    def state(self, now: float) -> str:
+        if self.failures < FAILURE_THRESHOLD:
+            return "closed"
+        if now < self.retry_at:
+            return "open"
+        return "half-open"
+
+    def allow_request(self, now: float) -> bool:
+        state = self.state(now)
+        if state == "half-open":
+            # Only let one trial through, the rest wait on its outcome.
+            self.retry_at = now + TRIAL_WINDOW
+        return state != "open"
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.retry_at = 0
+
+    def record_failure(self, now: float) -> None:
+        self.failures += 1
+        delay = BACKOFF_BASE * 2 ** (self.failures - 1)
+        self.retry_at = now + min(delay, BACKOFF_MAX)
+
+
+def entry_key(entry) -> str:
+    """
+    Gets a short, stable key for an entry, preferring the feed's own id for it.
+    """
+    raw = entry.get("id", None) or entry.get("link", None)
+    if not raw:
+        raw = "{}{}".format(entry.get("title", ""), entry.get("published", ""))
+    return hashlib.sha1(raw.encode("utf-8", "replace")).hexdigest()[:20]
+
+
+class SeenEntries:
+    """
+    A bounded index of entries already seen by a subscription.
+
+    Keys are evicted least recently seen first,
+    but never while the entry is still present in the feed.
+    """
+
+    __slots__ = ("_keys", "dirty")
+
+    def __init__(self, keys: Iterable[str] = ()):
+        self._keys = OrderedDict.fromkeys(keys)
+        self.dirty = False
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def update(self, entries) -> list:
+        """
+        Marks entries as seen, returning the ones which weren't already.
+        """
+        new = []
+        for entry in entries:
+            key = entry_key(entry)
+            if key in self._keys:
+                self._keys.move_to_end(key)
+            else:
+                self._keys[key] = None
+                new.append(entry)
+
+        limit = max(SEEN_LIMIT, len(entries))
+        while len(self._keys) > limit:
+            self._keys.popitem(last=False)
+
+        if new:
+            self.dirty = True
+        return new
+
+    def to_config(self) -> List[str]:
+        return list(self._keys)
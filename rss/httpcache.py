@@ -0,0 +1,134 @@
+import asyncio
+import json
+import logging
+import pathlib
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable
+
+__all__ = ["HTTPCache"]
+
+log = logging.getLogger("redbot.sinbadcogs.rss")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    body_hash TEXT,
+    entry_ids TEXT NOT NULL,
+    interval REAL NOT NULL,
+    next_poll_at REAL NOT NULL
+)
+"""
+
+
+class HTTPCache:
+    """
+    A small sqlite backed store of per feed fetch state, which survives restarts.
+
+    All access goes through a single worker thread,
+    so the connection is never shared between threads, and never blocks the loop.
+
+    This is only an optimization, so sqlite errors are logged and treated
+    as an empty cache rather than raised, and a corrupt file is replaced.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+        self._connection = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(str(self.path))
+            self._connection.execute(SCHEMA)
+        return self._connection
+
+    def _load(self) -> Dict[str, dict]:
+        cursor = self._connect().execute("SELECT * FROM feeds")
+        columns = [description[0] for description in cursor.description]
+        ret = {}
+        for values in cursor:
+            row = dict(zip(columns, values))
+            row["entry_ids"] = json.loads(row["entry_ids"])
+            ret[row.pop("url")] = row
+        return ret
+
+    def _save(self, rows: Dict[str, dict]) -> None:
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO feeds VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        url,
+                        row["etag"],
+                        row["last_modified"],
+                        row["body_hash"],
+                        json.dumps(row["entry_ids"]),
+                        row["interval"],
+                        row["next_poll_at"],
+                    )
+                    for url, row in rows.items()
+                ],
+            )
+
+    def _delete(self, urls: Iterable[str]) -> None:
+        with self._connect() as connection:
+            connection.executemany(
+                "DELETE FROM feeds WHERE url = ?", [(url,) for url in urls]
+            )
+
+    def _guarded(self, func, default, *args):
+        try:
+            return func(*args)
+        except (sqlite3.Error, ValueError) as exc:
+            log.exception("HTTP cache operation failed, continuing without it")
+            self._close()
+            if isinstance(exc, sqlite3.DatabaseError) and not isinstance(
+                exc, (sqlite3.OperationalError, sqlite3.IntegrityError)
+            ):
+                # Not a usable database, start over with a fresh one.
+                try:
+                    self.path.unlink()
+                except OSError:
+                    log.exception("Couldn't remove the corrupt HTTP cache")
+            return default
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except sqlite3.Error:
+                pass
+            self._connection = None
+
+    async def _run(self, func, default, *args):
+        if self._closed:
+            return default
+        return await asyncio.get_event_loop().run_in_executor(
+            self._executor, self._guarded, func, default, *args
+        )
+
+    async def load(self) -> Dict[str, dict]:
+        return await self._run(self._load, {})
+
+    async def save(self, rows: Dict[str, dict]) -> None:
+        if rows:
+            await self._run(self._save, None, rows)
+
+    async def delete(self, urls: Iterable[str]) -> None:
+        urls = list(urls)
+        if urls:
+            await self._run(self._delete, None, urls)
+
+    def close(self) -> None:
+        """
+        Closes the connection once anything already queued has finished.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._executor.submit(self._close)
+        self._executor.shutdown(wait=False)
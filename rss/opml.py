@@ -0,0 +1,79 @@
+import re
+from typing import Dict, List, Tuple
+from xml.etree import ElementTree
+from xml.parsers import expat
+
+__all__ = ["parse_opml", "build_opml"]
+
+WHITESPACE = re.compile(r"\s+")
+
+
+class _RootReached(Exception):
+    pass
+
+
+def _stop_at_root(*_args):
+    raise _RootReached()
+
+
+def _reject_declarations(*_args):
+    raise ValueError("OPML documents may not declare a DOCTYPE or entities")
+
+
+def _check_declarations(data: bytes):
+    """
+    Raises ValueError for documents declaring a DOCTYPE or entities.
+
+    Imported files are untrusted, and expanding entities can take
+    unbounded memory and time, so they are refused before parsing.
+    Those can only come before the root element, so reading stops there.
+    """
+    parser = expat.ParserCreate()
+    parser.StartDoctypeDeclHandler = _reject_declarations
+    parser.EntityDeclHandler = _reject_declarations
+    parser.StartElementHandler = _stop_at_root
+    try:
+        parser.Parse(data, True)
+    except _RootReached:
+        pass
+    except expat.ExpatError as exc:
+        raise ValueError("Invalid OPML") from exc
+
+
+def parse_opml(data: bytes) -> List[Tuple[str, str]]:
+    """
+    Gets (name, url) pairs for every feed in an OPML document.
+
+    Raises ValueError if the document can't be parsed,
+    or declares a DOCTYPE or entities.
+    """
+    _check_declarations(data)
+    try:
+        root = ElementTree.fromstring(data)
+    except ElementTree.ParseError as exc:
+        raise ValueError("Invalid OPML") from exc
+
+    ret = []
+    for outline in root.iter("outline"):
+        url = outline.get("xmlUrl", None)
+        if not url:
+            continue
+        name = outline.get("text", None) or outline.get("title", None) or url
+        # names are used as a single command argument
+        ret.append((WHITESPACE.sub("-", name.strip()), url.strip()))
+    return ret
+
+
+def build_opml(feeds: Dict[str, str], title: str) -> bytes:
+    """
+    Builds an OPML document from a mapping of feed names to urls.
+    """
+    root = ElementTree.Element("opml", version="2.0")
+    head = ElementTree.SubElement(root, "head")
+    ElementTree.SubElement(head, "title").text = title
+    body = ElementTree.SubElement(root, "body")
+    for name, url in feeds.items():
+        ElementTree.SubElement(
+            body, "outline", type="rss", text=name, title=name, xmlUrl=url
+        )
+    return ElementTree.tostring(root, encoding="utf-8")
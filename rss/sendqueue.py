@@ -0,0 +1,87 @@
+import asyncio
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import discord
+
+__all__ = ["SendQueue"]
+
+MESSAGE_LIMIT = 2000
+
+
+class SendQueue:
+    """
+    Paces outgoing posts per channel, retrying them when ratelimited.
+
+    Posts to a channel go out one batch at a time, in the order they were queued.
+    Consecutive plain text posts in a batch are merged into as few messages as fit.
+    """
+
+    def __init__(self, bot, *, interval: float = 1.0, max_retries: int = 3):
+        self.bot = bot
+        self.interval = interval
+        self.max_retries = max_retries
+        self._locks: Dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._next_allowed: Dict[int, float] = {}
+
+    @staticmethod
+    def merge(payloads: List[dict]) -> List[tuple]:
+        """
+        Groups payloads into messages, returning (kwargs, number of payloads) pairs.
+        """
+        merged: List[tuple] = []
+        for payload in payloads:
+            content = payload.get("content", None)
+            if merged and content and not payload.get("embed", None):
+                previous, count = merged[-1]
+                prev_content = previous.get("content", None)
+                if (
+                    prev_content
+                    and not previous.get("embed", None)
+                    and len(prev_content) + len(content) + 1 <= MESSAGE_LIMIT
+                ):
+                    merged[-1] = (
+                        {"content": f"{prev_content}\n{content}", "embed": None},
+                        count + 1,
+                    )
+                    continue
+            merged.append((payload, 1))
+        return merged
+
+    async def send_many(
+        self, destination: discord.TextChannel, payloads: List[dict]
+    ) -> List[bool]:
+        """
+        Sends payloads (kwargs for send) to a channel.
+
+        Returns whether each payload was delivered, in order.
+        """
+        results: List[bool] = []
+        async with self._locks[destination.id]:
+            for kwargs, count in self.merge(payloads):
+                results.extend([await self._send(destination, kwargs)] * count)
+        return results
+
+    async def _send(self, destination: discord.TextChannel, kwargs: dict) -> bool:
+
+        for attempt in range(self.max_retries + 1):
+            wait = self._next_allowed.get(destination.id, 0) - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            try:
+                await self.bot.send_filtered(destination, **kwargs)
+            except discord.HTTPException as exc:
+                if exc.status != 429 or attempt == self.max_retries:
+                    return False
+                try:
+                    retry_after = float(exc.response.headers["Retry-After"])
+                except (AttributeError, KeyError, TypeError, ValueError):
+                    retry_after = 5
+                self._next_allowed[destination.id] = time.monotonic() + retry_after
+            else:
+                self._next_allowed[destination.id] = time.monotonic() + self.interval
+                return True
+
+        return False
@@ -4,6 +4,8 @@ from typing import Optional, Tuple
 from datetime import datetime, timedelta, timezone
 from redbot.core.commands import Context, BadArgument, Converter
 
+from .cron import get_schedule
+from .tasks import MISFIRE_POLICIES
 from .time_utils import parse_time, parse_timedelta
 
 
@@ -21,10 +23,14 @@ class NoExitParser(argparse.ArgumentParser):
 class Schedule(Converter):
     async def convert(
         self, ctx: Context, argument: str
-    ) -> Tuple[str, datetime, Optional[timedelta]]:
+    ) -> Tuple[
+        str, datetime, Optional[timedelta], Optional[str], Optional[str], Optional[str]
+    ]:
 
         start: datetime
         recur: Optional[timedelta] = None
+        cron: Optional[str] = None
+        tz: Optional[str] = None
         command: Optional[str] = None
 
         # Blame iOS smart punctuation,
@@ -39,6 +45,11 @@ class Schedule(Converter):
 
         parser = NoExitParser(description="Scheduler event parsing", add_help=False)
         parser.add_argument("--every", nargs="*", dest="every", default=[])
+        parser.add_argument("--cron", nargs="*", dest="cron", default=[])
+        parser.add_argument("--tz", dest="tz", default=None)
+        parser.add_argument(
+            "--catch-up", dest="misfire", choices=MISFIRE_POLICIES, default=None
+        )
         if not command:
             parser.add_argument("command", nargs="*")
         at_or_in = parser.add_mutually_exclusive_group()
@@ -50,7 +61,22 @@ class Schedule(Converter):
         except Exception as exc:
             raise BadArgument() from exc
 
-        if not (vals["at"] or vals["in"]):
+        if vals["every"] and vals["cron"]:
+            raise BadArgument("You can only use one of `--every` or `--cron`")
+
+        if vals["tz"] and not vals["cron"]:
+            raise BadArgument("`--tz` only applies to `--cron`")
+
+        if vals["cron"]:
+            cron = " ".join(vals["cron"])
+            tz = vals["tz"]
+            try:
+                get_schedule(cron, tz or "UTC")
+            except ValueError as exc:
+                raise BadArgument(str(exc)) from None
+            # Cron schedules say when to run on their own.
+            start = datetime.now(timezone.utc)
+        elif not (vals["at"] or vals["in"]):
             raise BadArgument("You must provide one of `--start-in` or `--start-at`")
 
         if not command and not vals["command"]:
@@ -80,7 +106,7 @@ class Schedule(Converter):
             except Exception:
                 raise BadArgument("I couldn't understand that starting time.") from None
 
-        return command, start, recur
+        return command, start, recur, vals["misfire"], cron, tz
 
 
 class TempMute(Converter):
@@ -117,7 +143,7 @@ class TempMute(Converter):
 
         if vals["until"]:
             try:
-                start = parse_time(" ".join(vals["at"]))
+                start = parse_time(" ".join(vals["until"]))
             except Exception:
                 raise BadArgument("I couldn't understand that unmute time.") from None
 
@@ -0,0 +1,207 @@
+import bisect
+from calendar import monthrange
+from collections import deque
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Deque, Dict, Iterator, List
+
+from dateutil import tz as dateutil_tz
+
+__all__ = ["CronSchedule", "get_schedule"]
+
+MONTHS = {
+    name: number
+    for number, name in enumerate(
+        "jan feb mar apr may jun jul aug sep oct nov dec".split(), 1
+    )
+}
+WEEKDAYS = {
+    name: number for number, name in enumerate("sun mon tue wed thu fri sat".split())
+}
+
+
+def _parse_value(raw: str, names: Dict[str, int]) -> int:
+    raw = raw.lower()
+    if raw in names:
+        return names[raw]
+    if not raw.isdigit():
+        raise ValueError(f"Invalid cron value: {raw}")
+    return int(raw)
+
+
+def _parse_field(
+    raw: str, lowest: int, highest: int, names: Dict[str, int]
+) -> List[int]:
+    values = set()
+    for part in raw.split(","):
+        span, _sep, step_raw = part.partition("/")
+        if step_raw and not (step_raw.isdigit() and int(step_raw) > 0):
+            raise ValueError(f"Invalid cron step: {part}")
+        step = int(step_raw) if step_raw else 1
+
+        if span == "*":
+            start, end = lowest, highest
+        elif "-" in span:
+            start_raw, end_raw = span.split("-", 1)
+            start, end = _parse_value(start_raw, names), _parse_value(end_raw, names)
+        else:
+            start = _parse_value(span, names)
+            end = highest if step_raw else start
+
+        if not lowest <= start <= end <= highest:
+            raise ValueError(f"Cron value out of range: {part}")
+        values.update(range(start, end + 1, step))
+
+    return sorted(values)
+
+
+class CronSchedule:
+    """
+    A standard 5 field cron expression (minute hour day month weekday),
+    evaluated in a timezone, so that runs follow local time across DST changes.
+
+    Times which don't exist locally (skipped by DST) are skipped,
+    and times which happen twice locally only run the first time.
+    """
+
+    __slots__ = (
+        "expression",
+        "tz",
+        "minutes",
+        "hours",
+        "days",
+        "months",
+        "weekdays",
+        "_any_day",
+        "_any_weekday",
+    )
+
+    def __init__(self, expression: str, tz_name: str = "UTC"):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError("Cron expressions need exactly 5 fields")
+
+        tz = dateutil_tz.gettz(tz_name)
+        if tz is None:
+            raise ValueError(f"Unknown timezone: {tz_name}")
+
+        self.expression = " ".join(fields)
+        self.tz = tz
+        self.minutes = _parse_field(fields[0], 0, 59, {})
+        self.hours = _parse_field(fields[1], 0, 23, {})
+        self.days = _parse_field(fields[2], 1, 31, {})
+        self.months = _parse_field(fields[3], 1, 12, MONTHS)
+        # Both 0 and 7 are Sunday
+        self.weekdays = {d % 7 for d in _parse_field(fields[4], 0, 7, WEEKDAYS)}
+        # As with cron, if both are restricted (neither starts with *),
+        # matching either is enough, otherwise both need to match.
+        self._any_day = fields[2].startswith("*")
+        self._any_weekday = fields[4].startswith("*")
+
+        if self._any_weekday and not any(
+            day <= monthrange(2000, month)[1]  # 2000 being a leap year
+            for month in self.months
+            for day in self.days
+        ):
+            raise ValueError("That cron expression never runs")
+
+    def __repr__(self):
+        return f"<CronSchedule {self.expression!r}>"
+
+    def _day_matches(self, day: date) -> bool:
+        """
+        Steps on * still restrict the day, only both being restricted is lenient.
+
+        >>> CronSchedule("0 0 */2 * *")._day_matches(date(2021, 1, 2))
+        False
+        >>> CronSchedule("0 0 */2 * *")._day_matches(date(2021, 1, 3))
+        True
+        >>> CronSchedule("0 0 * * */2")._day_matches(date(2021, 1, 4))  # Monday
+        False
+        >>> CronSchedule("0 0 * * */2")._day_matches(date(2021, 1, 5))  # Tuesday
+        True
+        >>> CronSchedule("0 0 */2 * mon")._day_matches(date(2021, 1, 18))
+        False
+        >>> CronSchedule("0 0 1 * mon")._day_matches(date(2021, 1, 11))
+        True
+        """
+        dom = day.day in self.days
+        dow = day.isoweekday() % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return dom and dow
+        return dom or dow
+
+    def next_after(self, after: datetime) -> datetime:
+        """
+        Gets the first run strictly after an (aware) time, in UTC.
+
+        This skips ahead a field at a time rather than checking every minute.
+        """
+        local = after.astimezone(self.tz).replace(tzinfo=None, second=0, microsecond=0)
+        local += timedelta(minutes=1)
+
+        while True:
+            if local.month not in self.months:
+                index = bisect.bisect_left(self.months, local.month)
+                if index == len(self.months):
+                    local = datetime(local.year + 1, self.months[0], 1)
+                else:
+                    local = datetime(local.year, self.months[index], 1)
+                continue
+
+            if not self._day_matches(local.date()):
+                local = datetime(local.year, local.month, local.day)
+                local += timedelta(days=1)
+                continue
+
+            if local.hour not in self.hours:
+                index = bisect.bisect_left(self.hours, local.hour)
+                if index == len(self.hours):
+                    local = datetime(local.year, local.month, local.day)
+                    local += timedelta(days=1)
+                else:
+                    local = local.replace(hour=self.hours[index], minute=0)
+                continue
+
+            if local.minute not in self.minutes:
+                index = bisect.bisect_left(self.minutes, local.minute)
+                if index == len(self.minutes):
+                    local = local.replace(minute=0) + timedelta(hours=1)
+                    continue
+                local = local.replace(minute=self.minutes[index])
+
+            candidate = local.replace(tzinfo=self.tz)
+            if dateutil_tz.datetime_exists(candidate):
+                ret = candidate.astimezone(timezone.utc)
+                if ret > after:
+                    return ret
+            local += timedelta(minutes=1)
+
+    def runs_between(self, start: datetime, end: datetime) -> Iterator[datetime]:
+        """
+        Yields the runs after start, up to and including end.
+        """
+        when = self.next_after(start)
+        while when <= end:
+            yield when
+            when = self.next_after(when)
+
+    def last_runs(self, start: datetime, end: datetime, count: int) -> List[datetime]:
+        """
+        Gets up to the last count runs after start, up to and including end.
+
+        This looks back from the end in growing windows,
+        so a long gap since the start doesn't mean checking every run in it.
+        """
+        window = timedelta(minutes=count)
+        while True:
+            lower = max(start, end - window)
+            runs: Deque[datetime] = deque(self.runs_between(lower, end), maxlen=count)
+            if len(runs) == count or lower == start:
+                return list(runs)
+            window *= 2
+
+
+@lru_cache(maxsize=256)
+def get_schedule(expression: str, tz_name: str = "UTC") -> CronSchedule:
+    return CronSchedule(expression, tz_name)
@@ -0,0 +1,110 @@
+from collections import defaultdict
+from typing import Dict, Iterator, Optional, Set
+
+from .tasks import Task
+
+
+def normalize_attrs(attrs: Optional[dict]) -> dict:
+    """
+    Swaps any author or channel in task attributes for the matching id,
+    as tasks may not have those objects until they are hydrated.
+    """
+    ret = dict(attrs or {})
+    for attr in ("author", "channel"):
+        if attr in ret:
+            ret[f"{attr}_id"] = getattr(ret.pop(attr), "id", None)
+    return ret
+
+
+class TaskIndex:
+    """
+    Holds tasks, indexed by uid, author, channel, and guild.
+
+    Lookups by any of those are proportional to the number of matches,
+    rather than to the total number of tasks.
+    """
+
+    def __init__(self):
+        self._by_uid: Dict[str, Task] = {}
+        self._by_author: Dict[int, Set[str]] = defaultdict(set)
+        self._by_channel: Dict[int, Set[str]] = defaultdict(set)
+        self._by_guild: Dict[int, Set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._by_uid)
+
+    def __iter__(self) -> Iterator[Task]:
+        return iter(list(self._by_uid.values()))
+
+    def __contains__(self, task: Task) -> bool:
+        return task.uid in self._by_uid
+
+    @staticmethod
+    def _keys(task: Task):
+        return task.author_id, task.channel_id, task.guild_id
+
+    def add(self, task: Task):
+        if task.uid in self._by_uid:
+            self.remove(self._by_uid[task.uid])
+        self._by_uid[task.uid] = task
+        author_id, channel_id, guild_id = self._keys(task)
+        self._by_author[author_id].add(task.uid)
+        self._by_channel[channel_id].add(task.uid)
+        self._by_guild[guild_id].add(task.uid)
+
+    def remove(self, task: Task):
+        """
+        Removes a task, raising ValueError if it wasn't present.
+
+        Only the uid of the given task is used, the stored task is what
+        was indexed, so that's where the keys to clean up come from.
+        """
+        stored = self._by_uid.pop(task.uid, None)
+        if stored is None:
+            raise ValueError("Task not in index")
+        author_id, channel_id, guild_id = self._keys(stored)
+        for index, key in (
+            (self._by_author, author_id),
+            (self._by_channel, channel_id),
+            (self._by_guild, guild_id),
+        ):
+            uids = index.get(key, None)
+            if uids is None:
+                continue
+            uids.discard(stored.uid)
+            if not uids:
+                del index[key]
+
+    def get(self, uid) -> Optional[Task]:
+        return self._by_uid.get(str(uid), None)
+
+    def by_guild(self, guild_id: int) -> Iterator[Task]:
+        return (self._by_uid[uid] for uid in list(self._by_guild.get(guild_id, ())))
+
+    def candidates(self, attrs: Optional[dict]) -> Iterator[Task]:
+        """
+        Gets the tasks which could match the provided (normalized) attributes,
+        using the most selective index those attributes allow.
+
+        This is a superset, the attributes still need to be checked.
+        """
+        if not attrs:
+            return iter(self)
+
+        if "uid" in attrs:
+            task = self.get(attrs["uid"])
+            return iter([task] if task else [])
+
+        options = []
+        for attr, index in (
+            ("author_id", self._by_author),
+            ("channel_id", self._by_channel),
+        ):
+            if attr in attrs:
+                options.append(index.get(attrs[attr], set()))
+
+        if not options:
+            return iter(self)
+
+        uids = min(options, key=len)
+        return (self._by_uid[uid] for uid in list(uids))
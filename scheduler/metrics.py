@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional
+
+from .dataclass_tools import add_slots
+
+# How many recent runs timings are kept for.
+SAMPLE_SIZE = 1000
+
+
+@add_slots
+@dataclass()
+class RunRecord:
+    """
+    Timings for a single run of a task, as given to metrics hooks.
+
+    Times are from time.time(). lateness is None for runs which were
+    made up for after downtime, as those are late by design.
+    """
+
+    uid: str
+    guild_id: int
+    started: float
+    finished: float
+    lateness: Optional[float]
+    failed: bool
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(int(len(ordered) * pct / 100), len(ordered) - 1)
+    return ordered[index]
+
+
+class SchedulerMetrics:
+    """
+    Counts and recent timings for task runs.
+    """
+
+    def __init__(self, log: logging.Logger):
+        self.log = log
+        self.runs = 0
+        self.failures = 0
+        self.overlaps = 0  # Runs skipped as the last one was still going.
+        self.waiting = 0  # Runs held back by the concurrency limits right now.
+        self.lateness: Deque[float] = deque(maxlen=SAMPLE_SIZE)
+        self.durations: Deque[float] = deque(maxlen=SAMPLE_SIZE)
+        self._hooks: List[Callable[[RunRecord], object]] = []
+
+    def add_hook(self, hook: Callable[[RunRecord], object]):
+        """
+        Registers a callable to be given the RunRecord of each run.
+
+        Coroutine functions are scheduled, anything else is called directly.
+        """
+        if hook not in self._hooks:
+            self._hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[RunRecord], object]):
+        try:
+            self._hooks.remove(hook)
+        except ValueError:
+            pass
+
+    def record(self, record: RunRecord):
+        self.runs += 1
+        if record.failed:
+            self.failures += 1
+        if record.lateness is not None:
+            self.lateness.append(record.lateness)
+        self.durations.append(record.duration)
+
+        for hook in self._hooks:
+            try:
+                if asyncio.iscoroutinefunction(hook):
+                    asyncio.ensure_future(hook(record))
+                else:
+                    hook(record)
+            except Exception:
+                self.log.exception("Metrics hook %r failed", hook)
+
+    def summary(self) -> Dict[str, float]:
+        lateness, durations = list(self.lateness), list(self.durations)
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "overlaps": self.overlaps,
+            "waiting": self.waiting,
+            "lateness_p50": percentile(lateness, 50),
+            "lateness_p95": percentile(lateness, 95),
+            "lateness_max": max(lateness, default=0.0),
+            "duration_p50": percentile(durations, 50),
+            "duration_p95": percentile(durations, 95),
+            "duration_max": max(durations, default=0.0),
+        }
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, Optional
+
+import discord
+from redbot.core.config import Config
+
+from .tasks import Task
+
+
+class PendingWrites:
+    """
+    Write-behind storage for tasks.
+
+    Adds and removes are recorded in memory, then written out
+    with one config write per channel, either after a short delay
+    or when explicitly flushed.
+    """
+
+    def __init__(self, config: Config, log: logging.Logger, *, delay: float = 5):
+        self.config = config
+        self.log = log
+        self.delay = delay
+        # channel id -> uid -> serialized task, or None for a removal
+        self._pending: Dict[int, Dict[str, Optional[dict]]] = defaultdict(dict)
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop = asyncio.get_event_loop()
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._pending.values())
+
+    def add(self, task: Task):
+        self._pending[task.channel_id].update(task.to_config())
+        self._arm()
+
+    def remove(self, task: Task):
+        self._pending[task.channel_id][task.uid] = None
+        self._arm()
+
+    def _arm(self):
+        if self._timer is None:
+            self._timer = self._loop.call_later(self.delay, self._on_timer)
+
+    def _on_timer(self):
+        self._timer = None
+        self._loop.create_task(self.flush())
+
+    async def flush(self):
+        """
+        Writes out everything pending.
+        """
+        async with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            pending, self._pending = self._pending, defaultdict(dict)
+
+            for channel_id, changes in pending.items():
+                group = self.config.channel(discord.Object(id=channel_id))
+                try:
+                    async with group.tasks() as tasks:
+                        for uid, data in changes.items():
+                            if data is None:
+                                tasks.pop(uid, None)
+                            else:
+                                tasks[uid] = data
+                except Exception:
+                    self.log.exception("Failed saving tasks, will retry")
+                    # Anything newer which came in meanwhile takes precedence
+                    changes.update(self._pending[channel_id])
+                    self._pending[channel_id] = changes
+                    self._arm()
+
+    def close(self) -> Optional[asyncio.Future]:
+        """
+        Schedules a final flush, if one is needed.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending and not self._loop.is_closed():
+            return self._loop.create_task(self.flush())
+        return None
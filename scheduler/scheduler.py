@@ -1,20 +1,42 @@
 import asyncio
+import functools
+import heapq
+import itertools
+import random
+import time
 import discord
+from collections import defaultdict
 from datetime import datetime, timedelta, timezone
-from typing import Tuple, Optional, List, no_type_check
+from typing import Dict, Tuple, Optional, List, no_type_check
 from redbot.core import commands, checks
 from redbot.core.config import Config
 from redbot.core.i18n import Translator, cog_i18n
+from redbot.core.utils.chat_formatting import box
 from redbot.core.utils.menus import menu, DEFAULT_CONTROLS
 
 from .message import SchedulerMessage
 from .logs import get_logger
-from .tasks import Task
+from .tasks import AuthorGone, Task
+from .indexes import TaskIndex, normalize_attrs
+from .persistence import PendingWrites
+from .metrics import RunRecord, SchedulerMetrics
 from .converters import Schedule, non_numeric, TempMute
 from .checks import can_run_command
 
 _ = Translator("And I think it's gonna be a long long time...", __file__)
 
+# Seconds between runs made up for after downtime, so they don't all land at once.
+CATCHUP_SPACING = 1
+
+# Defaults for the global settings, also used until those are loaded.
+DEFAULT_MAX_CONCURRENCY = 10
+DEFAULT_PER_GUILD_CONCURRENCY = 2
+DEFAULT_JITTER = 5
+
+# Jitter is capped to this share of the time until a task's next run,
+# as a run still going when the next is due makes that one get skipped.
+JITTER_MAX_SHARE = 0.5
+
 
 @cog_i18n(_)
 class Scheduler(commands.Cog):
@@ -22,7 +44,7 @@ class Scheduler(commands.Cog):
     A somewhat sane scheduler cog
     """
 
-    __version__ = "1.0.23"
+    __version__ = "1.8.7"
     __author__ = "mikeshardmind(Sinbad)"
     __flavor_text__ = "Unhidden remindme."
 
@@ -32,11 +54,32 @@ class Scheduler(commands.Cog):
             self, identifier=78631113035100160, force_registration=True
         )
         self.config.register_channel(tasks={})  # Serialized Tasks go in here.
+        self.config.register_global(
+            max_concurrency=DEFAULT_MAX_CONCURRENCY,
+            per_guild_concurrency=DEFAULT_PER_GUILD_CONCURRENCY,
+            jitter=DEFAULT_JITTER,
+        )
         self.log = get_logger("sinbadcogs.scheduler")
         self.bg_loop_task = bot.loop.create_task(self.bg_loop())
+        self.catchup_task: Optional[asyncio.Task] = None
         self.scheduled = {}  # Might change this to a list later.
-        self.tasks = []
+        self.tasks = TaskIndex()
+        # (timestamp, tiebreaker, task), stale entries are skipped when popped.
+        self._heap: List[Tuple[float, int, Task]] = []
+        # uid -> (timestamp, tiebreaker) of the live heap entry for that task
+        self._deadlines: Dict[str, Tuple[float, int]] = {}
+        self._stale = 0
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
         self._iter_lock = asyncio.Lock()
+        self._writes = PendingWrites(self.config, self.log)
+        # Other cogs can add hooks to this to be told about each run.
+        self.metrics = SchedulerMetrics(self.log)
+        self._jitter: float = DEFAULT_JITTER
+        self._global_limit = asyncio.Semaphore(DEFAULT_MAX_CONCURRENCY)
+        self._guild_limits: Dict[int, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(DEFAULT_PER_GUILD_CONCURRENCY)
+        )
         self._original_cleanup_check = None
 
         cleanup = bot.get_cog("Cleanup")
@@ -45,7 +88,10 @@ class Scheduler(commands.Cog):
 
     def __unload(self):
         self.bg_loop_task.cancel()
+        if self.catchup_task:
+            self.catchup_task.cancel()
         [task.cancel() for task in self.scheduled.values()]
+        self._writes.close()
         self.log.handlers = []
         if self._original_cleanup_check:
             cog = self.bot.get_cog("Cleanup")
@@ -56,88 +102,304 @@ class Scheduler(commands.Cog):
     # but it doesn't hurt to add and could cover a weird edge case.
     __del__ = __unload
 
-    async def _load_tasks(self):
+    async def _load_tasks(self) -> Tuple[List[Tuple[datetime, Task]], List[Task]]:
+        """
+        Loads tasks, returning the runs missed while offline which should be
+        made up for, and the overdue tasks which shouldn't be.
+        """
+        # Tasks are hydrated shortly before they are needed, not here.
+        now = datetime.now(timezone.utc)
+        catchup: List[Tuple[datetime, Task]] = []
+        expired: List[Task] = []
+
         chan_dict = await self.config.all_channels()
         for channel_id, channel_data in chan_dict.items():
-            channel = self.bot.get_channel(channel_id)
-            if (
-                not channel
-                or not channel.permissions_for(channel.guild.me).read_messages
-            ):
-                continue
             tasks_dict = channel_data.get("tasks", {})
             for t in Task.bulk_from_config(bot=self.bot, **tasks_dict):
-                self.tasks.append(t)
+                missed = t.missed_runs(now)
+                catchup.extend((when, t) for when in missed)
+                if t.recurring or t.initial > now:
+                    self._add_task(t, persist=False)
+                else:
+                    # Overdue one-off tasks are finished by catch-up, if at all.
+                    self.tasks.add(t)
+                    if not missed:
+                        expired.append(t)
+
+        catchup.sort(key=lambda run: (run[0], run[1].uid))
+        return catchup, expired
+
+    async def run_catchup(self, runs: List[Tuple[datetime, Task]]):
+        """
+        Makes up for missed runs one at a time, oldest first.
+        """
+        for when, task in runs:
+            running = self.scheduled.get(task.uid, None)
+            if running:
+                await asyncio.wait([running])
+
+            if task not in self.tasks:
+                continue
+
+            self._mark_fired(task, when)
+            self._dispatch(task)
+            if not task.recurring:
+                await self._remove_tasks(task)
+            await asyncio.sleep(CATCHUP_SPACING)
+
+    def _mark_fired(self, task: Task, when: datetime):
+        if task.last_fired is None or when > task.last_fired:
+            task.last_fired = when
+            if task.recurring:
+                self._writes.add(task)
+
+    def _add_task(self, task: Task, *, persist: bool = True):
+        self.tasks.add(task)
+        if persist:
+            self._writes.add(task)
+        self._push(task, task.next_call_time().timestamp())
+
+    def _push(self, task: Task, when: float):
+        if task.uid in self._deadlines:
+            self._stale += 1  # Replaces the entry it had
+        count = next(self._counter)
+        self._deadlines[task.uid] = (when, count)
+        heapq.heappush(self._heap, (when, count, task))
+        if self._heap[0][2] is task:
+            # The sleeper needs to be re-armed for an earlier deadline
+            self._wakeup.set()
+        self._maybe_compact()
+
+    def _is_live(self, entry: Tuple[float, int, Task]) -> bool:
+        return self._deadlines.get(entry[2].uid, None) == entry[:2]
+
+    def _maybe_compact(self):
+        # Stale entries are otherwise only dropped when they come due,
+        # which for far off tasks could be months of holding onto them.
+        if self._stale > len(self._heap) // 2:
+            self._heap = [entry for entry in self._heap if self._is_live(entry)]
+            heapq.heapify(self._heap)
+            self._stale = 0
 
     async def _remove_tasks(self, *tasks: Task):
         async with self._iter_lock:
             for task in tasks:
+                if task not in self.tasks:
+                    continue  # Already removed elsewhere
                 self.tasks.remove(task)
-                await self.config.channel(task.channel).clear_raw("tasks", task.uid)
+                if self._deadlines.pop(task.uid, None) is not None:
+                    self._stale += 1
+                self._writes.remove(task)
+            self._maybe_compact()
+
+    async def prepare_limits(self):
+        """
+        (Re)creates the limits on how many tasks run at once from settings.
+        """
+        max_concurrency = await self.config.max_concurrency()
+        per_guild = await self.config.per_guild_concurrency()
+        self._jitter = await self.config.jitter()
+        # Anything holding the old ones releases those as normal.
+        self._global_limit = asyncio.Semaphore(max_concurrency)
+        self._guild_limits = defaultdict(lambda: asyncio.Semaphore(per_guild))
 
     async def bg_loop(self):
         await self.bot.wait_until_ready()
         await asyncio.sleep(2)
-        _guilds = [
-            g for g in self.bot.guilds if g.large and not (g.chunked or g.unavailable)
-        ]
-        await self.bot.request_offline_members(*_guilds)
+        await self.prepare_limits()
 
         async with self._iter_lock:
-            await self._load_tasks()
+            catchup, expired = await self._load_tasks()
+        await self._remove_tasks(*expired)
+        if catchup:
+            self.catchup_task = asyncio.ensure_future(self.run_catchup(catchup))
+
         while self is self.bot.get_cog("Scheduler"):
+            self._wakeup.clear()
             sleep_for = await self.schedule_upcoming()
-            await asyncio.sleep(sleep_for)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=sleep_for)
+            except asyncio.TimeoutError:
+                pass
 
-    async def delayed_wrap_and_invoke(self, task: Task, delay: int):
+    async def delayed_wrap_and_invoke(
+        self, task: Task, delay: float, target: Optional[float] = None
+    ):
         await asyncio.sleep(delay)
+        waiting = True
+        self.metrics.waiting += 1
+        try:
+            # Per guild first, so waiting on a busy guild doesn't hold a global slot.
+            async with self._guild_limits[task.guild_id]:
+                async with self._global_limit:
+                    self.metrics.waiting -= 1
+                    waiting = False
+                    await self._timed_invoke(task, delay, target)
+        finally:
+            if waiting:
+                self.metrics.waiting -= 1
+
+    async def _timed_invoke(self, task: Task, delay: float, target: Optional[float]):
+        started = time.time()
+        failed = True
+        try:
+            await self._invoke(task)
+            failed = False
+        finally:
+            self.metrics.record(
+                RunRecord(
+                    uid=task.uid,
+                    guild_id=task.guild_id,
+                    started=started,
+                    finished=time.time(),
+                    # Not counting the intentional delay from jitter.
+                    lateness=started - target - delay if target else None,
+                    failed=failed,
+                )
+            )
+
+    async def _invoke(self, task: Task):
+        try:
+            if not await task.hydrate(self.bot):
+                return
+        except AuthorGone:
+            self.log.info("Removing task %s, its author left the server", task.uid)
+            await self._remove_tasks(task)
+            return
         chan = task.channel
         if not chan.permissions_for(chan.guild.me).read_messages:
             return
         message = await task.get_message(self.bot)
         context = await self.bot.get_context(message)
-        await self.bot.invoke(context)
+        if context.valid:
+            if not await self.run_helper_directly(task, context):
+                await self.bot.invoke(context)
+            return
         for cog_name in ("CustomCommands", "Alias"):
             cog = self.bot.get_cog(cog_name)
             if cog:
                 await cog.on_message(message)
         # TODO: allow registering additional cogs to process on_message for.
 
-    async def schedule_upcoming(self) -> int:
+    async def passes_checks(
+        self, ctx: commands.Context, command: commands.Command
+    ) -> bool:
         """
-        Schedules some upcoming things as tasks. 
-        
+        Whether invoking a command would get past every check on it,
+        global ones (such as core's allow and deny lists) included.
+        """
+        if not all(c.enabled for c in (command, *command.parents)):
+            return False
+        try:
+            return bool(
+                await self.bot.can_run(ctx, call_once=True)
+                and await command.can_run(
+                    ctx, check_all_parents=True, change_permission_state=False
+                )
+            )
+        except commands.CommandError:
+            return False
+
+    async def run_helper_directly(self, task: Task, ctx: commands.Context) -> bool:
         """
+        Runs tasks which only use the schedhelpers commands
+        without parsing and invoking the command.
+        Anything which wouldn't pass the checks is left to the full path,
+        so that it's handled as any other failed invoke is.
 
-        # TODO: improve handlng of next time return
+        Returns if the task was handled.
+        """
+        if ctx.command is not self.helpers:
+            return False
+        _group, _sep, rest = task.content.partition(" ")
+        helper, _sep, content = rest.partition(" ")
+        content = content.strip()
+
+        command = self.helpers.get_command(helper)
+        if command is None or not await self.passes_checks(ctx, command):
+            return False
+
+        if command is self.say:
+            chan = task.channel
+            if content and chan.permissions_for(chan.guild.me).send_messages:
+                await chan.send(content)
+        elif command is self.swhisp:
+            if content:
+                try:
+                    await task.author.send(content)
+                except Exception:
+                    pass
+        else:
+            return False
 
-        async with self._iter_lock:
-            to_pop = []
-            for k, v in self.scheduled.items():
-                if v.done():
-                    to_pop.append(k)
-                    try:
-                        v.result()
-                    except Exception:
-                        self.log.exception("Dead task ", exc_info=True)
-
-            for k in to_pop:
-                self.scheduled.pop(k, None)
+        return True
+
+    def _dispatch(self, task: Task, target: Optional[float] = None):
+        if task.uid in self.scheduled:
+            self.metrics.overlaps += 1
+            return  # Still running from last time.
+        delay = self.get_jitter(task, target)
+        fut = asyncio.ensure_future(self.delayed_wrap_and_invoke(task, delay, target))
+        self.scheduled[task.uid] = fut
+        fut.add_done_callback(functools.partial(self._task_done, task.uid))
+
+    def get_jitter(self, task: Task, target: Optional[float] = None) -> float:
+        """
+        Gets a random delay for a run of a task.
+
+        Recurring tasks tend to share start times, this spreads them out a bit.
+        """
+        if not task.recurring or not self._jitter:
+            return 0
+        limit = self._jitter
+        if task.recur and not task.cron:
+            limit = min(limit, task.recur.total_seconds() * JITTER_MAX_SHARE)
+        elif limit > 60 * JITTER_MAX_SHARE:
+            # Cron runs are at least a minute apart, so only larger jitter needs this.
+            when = datetime.fromtimestamp(target or time.time(), timezone.utc)
+            gap = (task.next_call_time(when) - when).total_seconds()
+            limit = min(limit, gap * JITTER_MAX_SHARE)
+        return random.uniform(0, limit)
+
+    def _task_done(self, uid: str, fut: asyncio.Future):
+        if self.scheduled.get(uid, None) is fut:
+            del self.scheduled[uid]
+        if fut.cancelled():
+            return
+        exc = fut.exception()
+        if exc is not None:
+            self.log.exception("Dead task ", exc_info=exc)
+
+    async def schedule_upcoming(self) -> Optional[float]:
+        """
+        Runs everything which is due,
+        returning how long until the next thing is (None if nothing is scheduled)
+        """
 
+        now = time.time()
         to_remove: list = []
 
-        for task in self.tasks:
-            delay = task.next_call_delay
-            if delay < 30 and task.uid not in self.scheduled:
-                self.scheduled[task.uid] = asyncio.create_task(
-                    self.delayed_wrap_and_invoke(task, delay)
-                )
-                if not task.recur:
-                    to_remove.append(task)
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            when, _count, task = entry
+            if not self._is_live(entry):
+                self._stale -= 1
+                continue  # removed, or rescheduled since this entry was made
+            del self._deadlines[task.uid]
+
+            fired_at = datetime.fromtimestamp(when, tz=timezone.utc)
+            self._mark_fired(task, fired_at)
+            self._dispatch(task, when)
+            if task.recurring:
+                self._push(task, task.next_call_time(fired_at).timestamp())
+            else:
+                to_remove.append(task)
 
         await self._remove_tasks(*to_remove)
 
-        return 15
+        if not self._heap:
+            return None
+        return max(self._heap[0][0] - time.time(), 0)
 
     @property
     def task_class(self):
@@ -147,9 +409,11 @@ class Scheduler(commands.Cog):
     async def submit_task(self, task: Task):
         """ externally safe API """
         async with self._iter_lock:
-            self.tasks.append(task)
+            self._add_task(task)
 
     async def fetch_task_by_attrs_exact(self, **kwargs) -> List[Task]:
+        kwargs = normalize_attrs(kwargs)
+
         def pred(item):
             try:
                 return kwargs and all(getattr(item, k) == v for k, v in kwargs.items())
@@ -157,11 +421,13 @@ class Scheduler(commands.Cog):
                 return False
 
         async with self._iter_lock:
-            return [t for t in self.tasks if pred(t)]
+            return [t for t in self.tasks.candidates(kwargs) if pred(t)]
 
     async def fetch_task_by_attrs_lax(
         self, lax: Optional[dict] = None, strict: Optional[dict] = None
     ) -> List[Task]:
+        lax, strict = normalize_attrs(lax), normalize_attrs(strict)
+
         def pred(item):
             try:
                 if strict:
@@ -174,12 +440,12 @@ class Scheduler(commands.Cog):
             return True
 
         async with self._iter_lock:
-            return [t for t in self.tasks if pred(t)]
+            return [t for t in self.tasks.candidates(strict) if pred(t)]
 
     async def fetch_tasks_by_guild(self, guild: discord.Guild) -> List[Task]:
 
         async with self._iter_lock:
-            return [t for t in self.tasks if t.channel in guild.text_channels]
+            return list(self.tasks.by_guild(guild.id))
 
     # Commands go here
 
@@ -205,7 +471,19 @@ class Scheduler(commands.Cog):
 
                 --every interval
 
-            for recurring tasks
+            for recurring tasks, or:
+
+                --cron minute hour day month weekday
+                --tz timezone (optional, default UTC)
+
+            for tasks on a cron schedule,
+            (--start-in and --start-at are optional with this)
+            and:
+
+                --catch-up skip|once|all
+
+            for what to do about runs missed while the bot was offline.
+            (default: once for one-off tasks, skip for recurring ones)
 
         intervals look like:
 
@@ -221,19 +499,30 @@ class Scheduler(commands.Cog):
 
         times default to UTC if no timezone provided.
 
+        cron timezones are names like America/New_York
+
         Example use:
 
             [p]schedule autosync bansync True --start-at 12AM --every 1 day
 
+            [p]schedule weekdayping ping --cron 0 9 * * mon-fri --tz America/New_York
+
         Example use with other parsed commands:
 
         [p]schedule autosyndicate syndicatebans --sources 133049272517001216 --auto-destinations -- --start-at 12AM --every 1 hour
 
         This can also execute aliases.
         """
-        schedule: Tuple[str, datetime, Optional[timedelta]]
+        schedule: Tuple[
+            str,
+            datetime,
+            Optional[timedelta],
+            Optional[str],
+            Optional[str],
+            Optional[str],
+        ]
 
-        command, start, recur = schedule
+        command, start, recur, misfire, cron, tz = schedule
 
         t = Task(
             uid=ctx.message.id,
@@ -243,6 +532,9 @@ class Scheduler(commands.Cog):
             channel=ctx.channel,
             initial=start,
             recur=recur,
+            misfire=misfire,
+            cron=cron,
+            tz=tz,
         )
 
         if await self.fetch_task_by_attrs_exact(
@@ -251,9 +543,7 @@ class Scheduler(commands.Cog):
             return await ctx.send("You already have an event by that name here.")
 
         async with self._iter_lock:
-            async with self.config.channel(ctx.channel).tasks() as tsks:
-                tsks.update(t.to_config())
-            self.tasks.append(t)
+            self._add_task(t)
 
         ret = (
             f"Task Scheduled. You can cancel this task with "
@@ -261,14 +551,6 @@ class Scheduler(commands.Cog):
             f"or with `{ctx.clean_prefix}unschedule {event_name}`"
         )
 
-        if recur and t.next_call_delay < 60:
-            ret += (
-                "\nWith the intial start being set so soon, "
-                "you might have missed an initial use being scheduled by the loop. "
-                "you may find the very first expected run of this was missed or otherwise seems late. "
-                "Future runs will be on time."  # fractions of a second in terms of accuracy.
-            )
-
         await ctx.send(ret)
 
     @commands.guild_only()
@@ -307,7 +589,7 @@ class Scheduler(commands.Cog):
 
         if all_channels:
             tasks = await self.fetch_tasks_by_guild(ctx.guild)
-            tasks = [t for t in tasks if t.author == ctx.author]
+            tasks = [t for t in tasks if t.author_id == ctx.author.id]
         else:
             tasks = await self.fetch_task_by_attrs_exact(
                 author=ctx.author, channel=ctx.channel
@@ -345,7 +627,18 @@ class Scheduler(commands.Cog):
 
                 --every interval
 
-            for recurring reminders
+            for recurring reminders, or:
+
+                --cron minute hour day month weekday
+                --tz timezone (optional, default UTC)
+
+            for reminders on a cron schedule,
+            (--start-in and --start-at are optional with this)
+            and:
+
+                --catch-up skip|once|all
+
+            for what to do about reminders missed while the bot was offline.
 
         intervals look like:
 
@@ -365,7 +658,7 @@ class Scheduler(commands.Cog):
             `[p]remindme get some fresh air --start-in 4 hours`
         """
 
-        command, start, recur = reminder
+        command, start, recur, misfire, cron, tz = reminder
 
         t = Task(
             uid=ctx.message.id,
@@ -375,12 +668,13 @@ class Scheduler(commands.Cog):
             channel=ctx.channel,
             initial=start,
             recur=recur,
+            misfire=misfire,
+            cron=cron,
+            tz=tz,
         )
 
         async with self._iter_lock:
-            async with self.config.channel(ctx.channel).tasks() as tsks:
-                tsks.update(t.to_config())
-            self.tasks.append(t)
+            self._add_task(t)
 
         await ctx.tick()
 
@@ -408,6 +702,28 @@ class Scheduler(commands.Cog):
         """ Administrative commands for scheduler """
         pass
 
+    @checks.is_owner()
+    @scheduleradmin.command()
+    async def stats(self, ctx):
+        """ view how well the scheduler is keeping up """
+
+        s = self.metrics.summary()
+        lines = [
+            _("Scheduled tasks: {count}").format(count=len(self.tasks)),
+            _("Running or waiting to run: {count}").format(count=len(self.scheduled)),
+            _("Held back by concurrency limits: {count}").format(count=s["waiting"]),
+            _(
+                "Runs: {runs} ({failures} failed, {overlaps} skipped for overlap)"
+            ).format(**s),
+            _("Lateness (p50/p95/max): {p50:.2f}s / {p95:.2f}s / {max:.2f}s").format(
+                p50=s["lateness_p50"], p95=s["lateness_p95"], max=s["lateness_max"]
+            ),
+            _("Duration (p50/p95/max): {p50:.2f}s / {p95:.2f}s / {max:.2f}s").format(
+                p50=s["duration_p50"], p95=s["duration_p95"], max=s["duration_max"]
+            ),
+        ]
+        await ctx.send(box("\n".join(lines)))
+
     @scheduleradmin.command()
     async def viewall(self, ctx):
         """ view all scheduled events in a guild """
@@ -462,6 +778,47 @@ class Scheduler(commands.Cog):
         await self._remove_tasks(*tasks)
         await ctx.tick()
 
+    @checks.is_owner()
+    @commands.group()
+    async def schedulerset(self, ctx: commands.Context):
+        """
+        Global settings for scheduler
+        """
+        pass
+
+    @schedulerset.command(name="concurrency")
+    async def schedulerset_concurrency(
+        self, ctx: commands.Context, max_concurrent: int, per_guild: int
+    ):
+        """
+        Sets how many tasks may run at once, in total and per server.
+
+        Defaults are 10 in total, and 2 per server.
+        """
+        if max_concurrent < 1 or per_guild < 1:
+            return await ctx.send(_("Both limits need to be at least 1."))
+
+        await self.config.max_concurrency.set(max_concurrent)
+        await self.config.per_guild_concurrency.set(per_guild)
+        await self.prepare_limits()
+        await ctx.tick()
+
+    @schedulerset.command(name="jitter")
+    async def schedulerset_jitter(self, ctx: commands.Context, seconds: float):
+        """
+        Sets the most a recurring task may be randomly delayed by, in seconds.
+
+        This keeps tasks which share a start time from all running at once.
+        It's never more than half the time between a task's runs.
+        Default is 5 seconds, 0 disables this.
+        """
+        if not 0 <= seconds <= 60:
+            return await ctx.send(_("This needs to be between 0 and 60 seconds."))
+
+        await self.config.jitter.set(seconds)
+        await self.prepare_limits()
+        await ctx.tick()
+
     @commands.guild_only()
     @commands.group()
     async def tempmute(self, ctx):
@@ -528,13 +885,8 @@ class Scheduler(commands.Cog):
         )
 
         async with self._iter_lock:
-            self.scheduled[mute_task.uid] = asyncio.create_task(
-                self.delayed_wrap_and_invoke(mute_task, 0)
-            )
-
-            async with self.config.channel(ctx.channel).tasks() as tsks:
-                tsks.update(unmute_task.to_config())
-            self.tasks.append(unmute_task)
+            self._dispatch(mute_task)
+            self._add_task(unmute_task)
 
     @can_run_command("mute server")
     @tempmute.command(usage="<user> [reason] [args]", aliases=["guild"])
@@ -588,13 +940,8 @@ class Scheduler(commands.Cog):
         )
 
         async with self._iter_lock:
-            self.scheduled[mute_task.uid] = asyncio.create_task(
-                self.delayed_wrap_and_invoke(mute_task, 0)
-            )
-
-            async with self.config.channel(ctx.channel).tasks() as tsks:
-                tsks.update(unmute_task.to_config())
-            self.tasks.append(unmute_task)
+            self._dispatch(mute_task)
+            self._add_task(unmute_task)
 
     async def on_cog_add(self, cog):
 
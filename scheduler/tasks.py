@@ -1,32 +1,102 @@
 import discord
 from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass, field
-from typing import Optional, Union, cast
+from typing import List, Optional, Union, cast
 
+from .cron import CronSchedule, get_schedule
 from .message import SchedulerMessage
 from .time_utils import td_format
 from .dataclass_tools import add_slots
 
+MISFIRE_POLICIES = ("skip", "once", "all")
+# The most missed runs of a single task which will be made up for.
+MISFIRE_CAP = 10
+
+
+class AuthorGone(Exception):
+    """
+    Raised when hydrating a task whose author is known to have left.
+    """
+
+    pass
+
 
 @add_slots
 @dataclass()
 class Task:
     nicename: str
     uid: Union[int, str]
-    author: discord.Member
+    author: Optional[discord.Member] = field(compare=False)
     content: str
-    channel: discord.TextChannel
+    channel: Optional[discord.TextChannel] = field(compare=False)
     initial: datetime
     recur: Optional[timedelta] = None
+    # Tasks loaded from config only have these until hydrated.
+    author_id: int = 0
+    channel_id: int = 0
+    guild_id: int = 0
+    # One of MISFIRE_POLICIES, None for the default.
+    misfire: Optional[str] = None
+    last_fired: Optional[datetime] = None
+    # A cron expression, and the timezone to evaluate it in, used instead of recur.
+    cron: Optional[str] = None
+    tz: Optional[str] = None
 
     def __post_init__(self):
         # I'll take the minor performance hit for the convienice of not forgetting this
         # interacts with config later.
         self.uid = str(self.uid)
+        if self.author is not None:
+            self.author_id = self.author.id
+        if self.channel is not None:
+            self.channel_id = self.channel.id
+            self.guild_id = self.channel.guild.id
 
     def __hash__(self):
         return hash(self.uid)
 
+    @property
+    def recurring(self) -> bool:
+        return bool(self.recur or self.cron)
+
+    @property
+    def cron_schedule(self) -> Optional[CronSchedule]:
+        if not self.cron:
+            return None
+        return get_schedule(self.cron, self.tz or "UTC")
+
+    async def hydrate(self, bot: discord.Client) -> bool:
+        """
+        Resolves the channel and author, returning if that was possible.
+
+        Raises AuthorGone if the author isn't in the guild anymore,
+        as retrying that later would only repeat a request known to fail.
+        """
+        if self.channel is None:
+            channel = bot.get_channel(self.channel_id)
+            if channel is None:
+                return False
+            self.channel = channel
+
+        guild = self.channel.guild
+        if guild.unavailable:
+            return False
+
+        if self.author is None:
+            author = guild.get_member(self.author_id)
+            if author is None:
+                if guild.chunked:
+                    raise AuthorGone()  # Every member is cached already.
+                try:
+                    author = await guild.fetch_member(self.author_id)
+                except discord.NotFound:
+                    raise AuthorGone() from None
+                except discord.HTTPException:
+                    return False
+            self.author = author
+
+        return True
+
     async def get_message(self, bot):
 
         pfx = (await bot.get_prefix(self.channel))[0]
@@ -40,11 +110,18 @@ class Task:
         return {
             self.uid: {
                 "nicename": self.nicename,
-                "author": self.author.id,
+                "author": self.author_id,
                 "content": self.content,
-                "channel": self.channel.id,
+                "channel": self.channel_id,
+                "guild": self.guild_id,
                 "initial": self.initial.timestamp(),
                 "recur": self.recur.total_seconds() if self.recur else None,
+                "misfire": self.misfire,
+                "last_fired": (
+                    self.last_fired.timestamp() if self.last_fired else None
+                ),
+                "cron": self.cron,
+                "tz": self.tz,
             }
         }
 
@@ -58,29 +135,98 @@ class Task:
             initial = datetime.fromtimestamp(initial_ts, tz=timezone.utc)
             recur_raw = data.pop("recur", None)
             recur = timedelta(seconds=recur_raw) if recur_raw else None
-            channel = bot.get_channel(cid)
-            if channel:
-                author = channel.guild.get_member(aid)
-                if author:
-                    yield cls(
-                        initial=initial,
-                        recur=recur,
-                        channel=channel,
-                        author=author,
-                        uid=uid,
-                        **data,
-                    )
+            last_fired_ts = data.pop("last_fired", None)
+            last_fired = (
+                datetime.fromtimestamp(last_fired_ts, tz=timezone.utc)
+                if last_fired_ts
+                else None
+            )
+            gid = data.pop("guild", None)
+            if gid is None:  # Saved before the guild was stored with tasks.
+                channel = bot.get_channel(cid)
+                if not channel:
+                    continue
+                gid = channel.guild.id
+            yield cls(
+                initial=initial,
+                recur=recur,
+                channel=None,
+                author=None,
+                channel_id=cid,
+                author_id=aid,
+                guild_id=gid,
+                last_fired=last_fired,
+                uid=uid,
+                **data,
+            )
+
+    def next_call_time(self, after: Optional[datetime] = None) -> datetime:
+        """
+        Gets when this should next run, strictly after a time (default: now).
+
+        One-off tasks always give their initial time, even if it has passed.
+        """
+
+        after = after or datetime.now(timezone.utc)
+
+        if self.cron:
+            # Runs on or after initial, so look from just before it at the earliest.
+            after = max(after, self.initial - timedelta(microseconds=1))
+            return cast(CronSchedule, self.cron_schedule).next_after(after)
+        elif self.recur and after >= self.initial:
+            elapsed_runs = (after - self.initial) // self.recur
+            return self.initial + (elapsed_runs + 1) * self.recur
+        else:
+            return self.initial
 
     @property
-    def next_call_delay(self) -> float:
+    def misfire_policy(self) -> str:
+        if self.misfire:
+            return self.misfire
+        # A missed reminder is still useful late, a missed repeat usually isn't.
+        return "skip" if self.recurring else "once"
 
-        now = datetime.now(timezone.utc)
+    def missed_runs(self, now: Optional[datetime] = None) -> List[datetime]:
+        """
+        Gets the runs which should be made up for, oldest first,
+        based on when this last fired and its misfire policy.
+        """
+
+        now = now or datetime.now(timezone.utc)
+        policy = self.misfire_policy
+
+        if policy == "skip" or self.initial > now:
+            return []
+
+        if not self.recurring:
+            return [] if self.last_fired else [self.initial]
+
+        count = 1 if policy == "once" else MISFIRE_CAP
 
-        if self.recur and now >= self.initial:
-            raw_interval = self.recur.total_seconds()
-            return raw_interval - ((now - self.initial).total_seconds() % raw_interval)
+        if self.cron:
+            if self.last_fired is None or self.last_fired < self.initial:
+                start = self.initial - timedelta(microseconds=1)
+            else:
+                start = self.last_fired
+            schedule = cast(CronSchedule, self.cron_schedule)
+            return schedule.last_runs(start, now, count)
+
+        last = (now - self.initial) // self.recur
+        if self.last_fired is None or self.last_fired < self.initial:
+            first = 0
         else:
-            return (self.initial - now).total_seconds()
+            first = (self.last_fired - self.initial) // self.recur + 1
+
+        if first > last:
+            return []
+        first = max(first, last - count + 1)
+        return [self.initial + k * self.recur for k in range(first, last + 1)]
+
+    @property
+    def next_call_delay(self) -> float:
+
+        now = datetime.now(timezone.utc)
+        return (self.next_call_time(now) - now).total_seconds()
 
     def to_embed(self, index: int, page_count: int, color: discord.Color):
 
@@ -89,8 +235,8 @@ class Task:
         embed = discord.Embed(color=color, timestamp=next_run_at)
         embed.title = f"Now viewing {index} of {page_count} selected tasks"
         embed.add_field(name="Command", value=f"[p]{self.content}")
-        embed.add_field(name="Channel", value=self.channel.mention)
-        embed.add_field(name="Creator", value=self.author.mention)
+        embed.add_field(name="Channel", value=f"<#{self.channel_id}>")
+        embed.add_field(name="Creator", value=f"<@{self.author_id}>")
         embed.add_field(name="Task ID", value=self.uid)
 
         try:
@@ -104,7 +250,12 @@ class Task:
         else:
             description = f"{self.nicename} started running on {fmt_date}."
 
-        if self.recur:
+        if self.cron:
+            description += (
+                f"\nIt runs on the schedule `{self.cron}` ({self.tz or 'UTC'})"
+            )
+            footer = "Next runtime:"
+        elif self.recur:
             description += f"\nIt repeats every {td_format(self.recur)}"
             footer = "Next runtime:"
         else:
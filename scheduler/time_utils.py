@@ -1,4 +1,5 @@
 import re
+import time
 from datetime import datetime as dt, timedelta
 from typing import Callable, Optional
 
@@ -31,8 +32,24 @@ def gen_tzinfos():
                 yield tzdate.tzname(), tzinfo
 
 
+# Which abbreviations are in use changes with DST,
+# so the table is rebuilt at the start of each hour.
+_tzinfos: dict = {}
+_tzinfos_expiry = 0.0
+
+
+def get_tzinfos() -> dict:
+    global _tzinfos, _tzinfos_expiry
+
+    now = time.time()
+    if now >= _tzinfos_expiry:
+        _tzinfos = dict(gen_tzinfos())
+        _tzinfos_expiry = (now // 3600 + 1) * 3600
+    return _tzinfos
+
+
 def parse_time(datetimestring: str):
-    ret = parser.parse(datetimestring, tzinfos=dict(gen_tzinfos()))
+    ret = parser.parse(datetimestring, tzinfos=get_tzinfos())
     ret = ret.astimezone(pytz.utc)
     return ret
 